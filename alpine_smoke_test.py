@@ -21,10 +21,11 @@ import sys
 import pathlib
 import datetime
 import subprocess
-import tempfile
 import json
 from typing import Dict
 
+from smoke_pages import data_page_url
+
 # Configuration
 TARGET_URL = os.getenv("TARGET_URL", "https://example.com")
 CACHE_DIR = pathlib.Path(os.getenv("CACHE_DIR", "/data"))
@@ -210,17 +211,10 @@ def test_chrome_selenium() -> bool:
             driver = webdriver.Chrome(options=chrome_options)
         
         try:
-            # Create a simple local HTML file
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Alpine Chrome Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.get(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.get(data_page_url("Alpine Chrome Test"))
             title = driver.title
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"alpine_chrome_{timestamp}.png"
@@ -270,17 +264,10 @@ def test_firefox_selenium() -> bool:
             driver = webdriver.Firefox(options=firefox_options)
         
         try:
-            # Create a simple local HTML file
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Alpine Firefox Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.get(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.get(data_page_url("Alpine Firefox Test"))
             title = driver.title
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"alpine_firefox_{timestamp}.png"
@@ -308,17 +295,10 @@ def test_seleniumbase_chrome() -> bool:
         try:
             driver.set_window_size(1366, 768)
             
-            # Create a simple local HTML file
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Alpine SeleniumBase Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.open(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.open(data_page_url("Alpine SeleniumBase Test"))
             title = driver.get_title()
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"alpine_seleniumbase_{timestamp}.png"
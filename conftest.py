@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the root test modules.
+
+fixture_runner.script_fixtures() provides the same fixtures when the
+modules run as plain scripts (python test_features.py).
+"""
+
+import pytest
+
+from fixture_runner import export_cache_dir
+
+
+@pytest.fixture(scope="session")
+def _shared_cache_root(tmp_path_factory):
+    return tmp_path_factory.mktemp("rpa_cache")
+
+
+@pytest.fixture
+def shared_cache_dir(_shared_cache_root, monkeypatch):
+    """CACHE_DIR for tests that only need one to exist when a smoke-test
+    module is imported; one directory per session (per pytest-xdist worker)."""
+    return export_cache_dir(monkeypatch, _shared_cache_root)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Throwaway CACHE_DIR for tests that write to it, exported in the environment."""
+    return export_cache_dir(monkeypatch, tmp_path)
@@ -22,6 +22,7 @@ Author: RPA Worker Selenium Team
 
 import os
 import json
+import shutil
 import subprocess
 import tempfile
 from pathlib import Path
@@ -206,8 +207,7 @@ def check_prerequisites():
     missing_tools = []
     
     for tool in required_tools:
-        result = subprocess.run(["which", tool], capture_output=True)
-        if result.returncode != 0:
+        if shutil.which(tool) is None:
             missing_tools.append(tool)
     
     if missing_tools:
@@ -0,0 +1,101 @@
+"""
+Run the root test functions outside pytest.
+
+The test modules also run as plain scripts (python test_features.py);
+their main() wraps the run in script_fixtures(), which provides the
+fixtures defined in conftest.py without pytest. Plain stdlib only, so
+the scripts work where pytest is not installed.
+"""
+
+import contextlib
+import functools
+import inspect
+import os
+import pathlib
+import tempfile
+
+_MISSING = object()
+
+
+def export_cache_dir(monkeypatch, path):
+    """Point CACHE_DIR at `path` for the current test and return it."""
+    monkeypatch.setenv("CACHE_DIR", str(path))
+    return path
+
+
+class ScriptMonkeyPatch:
+    """The subset of pytest's monkeypatch used by the root tests."""
+
+    def __init__(self):
+        self._undo = []
+
+    def setattr(self, target, name, value):
+        old = getattr(target, name, _MISSING)
+
+        def restore():
+            if old is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, old)
+
+        self._undo.append(restore)
+        setattr(target, name, value)
+
+    def setenv(self, name, value):
+        self._save_env(name)
+        os.environ[name] = str(value)
+
+    def delenv(self, name, raising=True):
+        if name not in os.environ:
+            if raising:
+                raise KeyError(name)
+            return
+        self._save_env(name)
+        del os.environ[name]
+
+    def _save_env(self, name):
+        old = os.environ.get(name)
+
+        def restore():
+            if old is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = old
+
+        self._undo.append(restore)
+
+    def undo(self):
+        while self._undo:
+            self._undo.pop()()
+
+
+def _call_with_fixtures(shared_root, test):
+    """Call `test` once, passing the conftest.py fixtures that it names."""
+    with contextlib.ExitStack() as stack:
+        monkeypatch = ScriptMonkeyPatch()
+        stack.callback(monkeypatch.undo)
+
+        @functools.lru_cache(maxsize=None)
+        def tmp_path():
+            return pathlib.Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="rpa_test_")))
+
+        providers = {
+            "monkeypatch": lambda: monkeypatch,
+            "tmp_path": tmp_path,
+            "cache_dir": lambda: export_cache_dir(monkeypatch, tmp_path()),
+            "shared_cache_dir": lambda: export_cache_dir(monkeypatch, shared_root),
+        }
+        kwargs = {name: providers[name]() for name in inspect.signature(test).parameters}
+        return test(**kwargs)
+
+
+@contextlib.contextmanager
+def script_fixtures():
+    """Yield a runner that calls a test function with its fixtures outside pytest.
+
+    Environment and attribute changes are undone and temporary directories
+    removed after each call; the shared CACHE_DIR lives until the with block
+    exits.
+    """
+    with tempfile.TemporaryDirectory(prefix="rpa_cache_") as shared_root:
+        yield functools.partial(_call_with_fixtures, pathlib.Path(shared_root))
@@ -30,9 +30,18 @@ import datetime
 import subprocess
 import importlib.util
 import tempfile
+import threading
 import json
 from typing import Dict, List, Tuple, Optional
 
+from proc_scan import check_process_alive
+from smoke_pages import data_page_url
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 TARGET_URL = os.getenv("TARGET_URL", "https://example.com")
 CACHE_DIR = pathlib.Path(os.getenv("CACHE_DIR", "/data"))
@@ -46,6 +55,7 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # Test results tracking
 test_results: Dict[str, Dict[str, any]] = {}
+_results_lock = threading.Lock()
 
 
 def log(message: str, level: str = "INFO") -> None:
@@ -61,14 +71,23 @@ def log_verbose(message: str) -> None:
         log(message, "DEBUG")
 
 
+def dump_report(report_data: Dict) -> bytes:
+    """Serialize a report to indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(report_data, option=orjson.OPT_INDENT_2)
+    return json.dumps(report_data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def record_test(test_name: str, passed: bool, details: str = "", skipped: bool = False) -> None:
-    """Record test result."""
-    test_results[test_name] = {
+    """Record test result. Safe to call from worker threads."""
+    result = {
         "passed": passed,
         "details": details,
         "timestamp": datetime.datetime.now().isoformat(),
         "skipped": skipped,
     }
+    with _results_lock:
+        test_results[test_name] = result
     if skipped:
         status = "⚠ SKIP"
     else:
@@ -226,17 +245,10 @@ def test_chrome_selenium() -> bool:
             driver = webdriver.Chrome(options=chrome_options)
         
         try:
-            # Use local HTML file to avoid network issues
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Chrome Selenium Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.get(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.get(data_page_url("Chrome Selenium Test"))
             title = driver.title
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"chrome_selenium_{timestamp}.png"
@@ -286,17 +298,10 @@ def test_firefox_selenium() -> bool:
             driver = webdriver.Firefox(options=firefox_options)
         
         try:
-            # Use local HTML file to avoid network issues
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Firefox Selenium Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.get(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.get(data_page_url("Firefox Selenium Test"))
             title = driver.title
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"firefox_selenium_{timestamp}.png"
@@ -354,17 +359,10 @@ def test_brave_selenium() -> bool:
             driver = webdriver.Chrome(options=chrome_options)
         
         try:
-            # Use local HTML file to avoid network issues
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>Brave Selenium Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.get(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.get(data_page_url("Brave Selenium Test"))
             title = driver.title
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"brave_selenium_{timestamp}.png"
@@ -393,17 +391,10 @@ def test_seleniumbase() -> bool:
         try:
             driver.set_window_size(1366, 768)
             
-            # Use local HTML file to avoid network issues
-            test_html = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False)
-            test_html.write('<html><head><title>SeleniumBase Test</title></head><body><h1>Test</h1></body></html>')
-            test_html.close()
-            
-            driver.open(f"file://{test_html.name}")
+            # In-memory page: no temp file to write or clean up, no network needed
+            driver.open(data_page_url("SeleniumBase Test"))
             title = driver.get_title()
             
-            # Clean up
-            os.unlink(test_html.name)
-            
             # Save screenshot
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = CACHE_DIR / f"seleniumbase_{timestamp}.png"
@@ -567,19 +558,6 @@ def test_environment_variables() -> bool:
         return False
 
 
-def check_process_alive(process_name: str) -> bool:
-    """Check if a process is running."""
-    try:
-        result = subprocess.run(
-            ['pgrep', '-f', process_name],
-            capture_output=True,
-            text=True
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
-
-
 def test_xvfb_process() -> bool:
     """Test if Xvfb is running when enabled."""
     log("Testing Xvfb process...")
@@ -683,12 +661,16 @@ def generate_report() -> Tuple[int, int, int]:
     log("FULL SMOKE TEST REPORT")
     log("=" * 80)
     
-    total = len(test_results)
-    skipped = sum(1 for result in test_results.values() if result.get("skipped"))
+    # Snapshot so a late record_test cannot change the counts mid-report
+    with _results_lock:
+        results = dict(test_results)
+    
+    total = len(results)
+    skipped = sum(1 for result in results.values() if result.get("skipped"))
     executed = total - skipped
     passed = sum(
         1
-        for result in test_results.values()
+        for result in results.values()
         if result["passed"] and not result.get("skipped")
     )
     failed = executed - passed
@@ -703,12 +685,12 @@ def generate_report() -> Tuple[int, int, int]:
     
     if failed > 0:
         log("Failed Tests:")
-        for test_name, result in test_results.items():
+        for test_name, result in results.items():
             if not result["passed"]:
                 log(f"  ✗ {test_name}: {result['details']}")
     
     log("\nDetailed Results:")
-    for test_name, result in test_results.items():
+    for test_name, result in results.items():
         status = "⚠ SKIP" if result.get("skipped") else ("✓ PASS" if result["passed"] else "✗ FAIL")
         log(f"  {status} {test_name}: {result['details']}")
     
@@ -724,11 +706,10 @@ def generate_report() -> Tuple[int, int, int]:
         "failed": failed,
         "skipped": skipped,
         "success_rate": success_rate,
-        "tests": test_results
+        "tests": results
     }
     
-    with open(report_path, "w") as f:
-        json.dump(report_data, f, indent=2)
+    report_path.write_bytes(dump_report(report_data))
     
     log(f"\nReport saved to: {report_path}")
     log("=" * 80 + "\n")
@@ -0,0 +1,82 @@
+"""
+Process checks shared by smoke_test.py and full_smoke_test.py.
+
+Kept free of third-party imports so either smoke test can use it without
+pulling in the other's dependencies.
+"""
+
+import os
+import subprocess
+
+
+def _pgrep(process_name):
+    """Check a single process name with pgrep -f."""
+    try:
+        result = subprocess.run(
+            ['pgrep', '-f', process_name],
+            capture_output=True,
+            text=True
+        )
+        return result.returncode == 0
+    except Exception as e:
+        print(f"[smoke] Error checking process {process_name}: {e}")
+        return False
+
+
+def check_processes_alive(names):
+    """
+    Check several processes in a single pass over /proc.
+
+    Matches each name against the full command line, like ``pgrep -f``,
+    so wrapped processes (e.g. pjeoffice launched through java) are still
+    found, without forking one pgrep child per name. The calling process
+    is skipped like pgrep skips itself.
+
+    Args:
+        names: Process names to look for
+
+    Returns:
+        dict: Mapping of each name to True if a matching process is running
+    """
+    alive = {name: False for name in names}
+    pending = set(alive)
+    own_pid = str(os.getpid())
+
+    try:
+        entries = os.scandir("/proc")
+    except OSError:
+        # No procfs available (non-Linux host): fall back to pgrep
+        for name in names:
+            alive[name] = _pgrep(name)
+        return alive
+
+    with entries:
+        for entry in entries:
+            if not pending:
+                break
+            if not entry.name.isdigit() or entry.name == own_pid:
+                continue
+            try:
+                with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                    cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+            except OSError:
+                # Process exited or is not readable
+                continue
+            for name in [n for n in pending if n in cmdline]:
+                alive[name] = True
+                pending.discard(name)
+
+    return alive
+
+
+def check_process_alive(process_name):
+    """
+    Check if a process is running by name.
+
+    Args:
+        process_name: Name of the process to check
+
+    Returns:
+        bool: True if process is running, False otherwise
+    """
+    return check_processes_alive([process_name])[process_name]
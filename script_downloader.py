@@ -14,9 +14,13 @@ import sys
 import pathlib
 import requests
 import hashlib
+import functools
 import re
 from urllib.parse import urlparse, parse_qs, unquote
 
+# Copy buffer for streamed downloads
+_COPY_CHUNK_SIZE = 1 << 20
+
 _CONTENT_DISP_RE = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', re.IGNORECASE)
 
 def _sanitize(name: str) -> str:
@@ -58,11 +62,13 @@ def download_file(url, destination_path):
     """
     try:
         print(f"[downloader] Downloading from: {url}")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(destination_path, 'wb') as f:
-            f.write(response.content)
+        with requests.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            
+            # Stream straight to disk instead of holding the whole body
+            with open(destination_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=_COPY_CHUNK_SIZE):
+                    f.write(chunk)
         
         print(f"[downloader] Saved to: {destination_path}")
         return True
@@ -75,6 +81,7 @@ def download_file(url, destination_path):
         return False
 
 
+@functools.lru_cache(maxsize=1024)
 def get_filename_from_url(url: str) -> str:
     """
     Retrocompatível:
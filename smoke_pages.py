@@ -0,0 +1,15 @@
+"""
+Test pages shared by full_smoke_test.py, alpine_smoke_test.py and
+test_browser_drivers.py.
+
+Pages are served as data: URLs, so the browser checks need no temporary
+files or file:// access.
+"""
+
+import base64
+
+
+def data_page_url(title: str) -> str:
+    """Build an in-memory data: URL for a one-line test page with the given title."""
+    html = f"<html><head><title>{title}</title></head><body><h1>Test</h1></body></html>"
+    return "data:text/html;charset=utf-8;base64," + base64.b64encode(html.encode("utf-8")).decode("ascii")
@@ -12,11 +12,20 @@ Environment Variables:
 
 import os
 import datetime
+import functools
 import pathlib
 import sys
 import importlib.util
-import re
 import subprocess
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from proc_scan import check_process_alive, check_processes_alive
+
+try:
+    import requests
+except ImportError:
+    requests = None
 
 
 # Configuration
@@ -25,12 +34,32 @@ CACHE_DIR = pathlib.Path(os.getenv("CACHE_DIR", "/data"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 TEST_HELPERS = os.getenv("TEST_HELPERS", "0") == "1"
 CHECK_PROCESSES = os.getenv("CHECK_PROCESSES", "0") == "1"
+TITLE_CLOSE_TAG = b"</title>"
+
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def path_exists(path):
+    """
+    Cached os.path.exists for install paths that do not change while
+    the container runs (PJeOffice launcher, /app/src).
+    
+    Args:
+        path: Path to check
+        
+    Returns:
+        bool: True if the path exists
+    """
+    return os.path.exists(path)
 
 
 def extract_title_from_html(html_content):
     """
-    Extract title from HTML content using regex.
-    More robust than simple string splitting.
+    Extract title from HTML content with a linear scan.
+    Uses plain str.find calls instead of a backtracking regex.
     
     Args:
         html_content: HTML content as string
@@ -38,51 +67,78 @@ def extract_title_from_html(html_content):
     Returns:
         str: Extracted title or "Desconhecido" if not found
     """
-    # Use regex to find the first title tag (case-insensitive)
-    match = re.search(r'<title[^>]*>(.*?)</title>', html_content, re.IGNORECASE | re.DOTALL)
-    
-    if match:
-        title = match.group(1).strip()
-        # Clean up whitespace and newlines
-        title = re.sub(r'\s+', ' ', title)
-        return title if title else "Desconhecido"
-    
-    return "Desconhecido"
+    # Tag names are ASCII, so a lowercased copy is enough for a
+    # case-insensitive search. Fall back to ASCII-only folding if
+    # lower() changed the length, so indices still line up.
+    lowered = html_content.lower()
+    if len(lowered) != len(html_content):
+        lowered = html_content.translate(_ASCII_LOWER)
+    
+    tag_start = lowered.find("<title")
+    if tag_start == -1:
+        return "Desconhecido"
+    
+    content_start = lowered.find(">", tag_start + 6) + 1
+    if content_start == 0:
+        return "Desconhecido"
+    
+    content_end = lowered.find("</title>", content_start)
+    if content_end == -1:
+        return "Desconhecido"
+    
+    # Clean up whitespace and newlines (split() also trims the ends)
+    title = " ".join(html_content[content_start:content_end].split())
+    return title if title else "Desconhecido"
 
 
-def check_process_alive(process_name):
+def save_response_head(response, path, chunk_size=65536):
     """
-    Check if a process is running by name.
+    Stream an HTTP response body to disk, keeping only its head in memory.
+    
+    The body is written chunk by chunk; bytes are buffered only until the
+    first closing title tag, which is all extract_title_from_html needs.
     
     Args:
-        process_name: Name of the process to check
+        response: requests.Response opened with stream=True
+        path: File to write the raw body to
+        chunk_size: Read size per chunk
         
     Returns:
-        bool: True if process is running, False otherwise
+        str: Decoded body up to and including the first </title>
     """
-    try:
-        result = subprocess.run(
-            ['pgrep', '-f', process_name],
-            capture_output=True,
-            text=True
-        )
-        return result.returncode == 0
-    except Exception as e:
-        print(f"[smoke] Error checking process {process_name}: {e}")
-        return False
+    head = bytearray()
+    title_found = False
+    
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+            if title_found:
+                continue
+            # Re-check the tail of the previous chunk in case the tag was split
+            start = max(len(head) - len(TITLE_CLOSE_TAG) + 1, 0)
+            head += chunk
+            if bytes(head[start:]).lower().find(TITLE_CLOSE_TAG) != -1:
+                title_found = True
+    
+    return head.decode(response.encoding or "utf-8", errors="replace")
 
 
-def check_xvfb_alive():
+def check_xvfb_alive(alive=None):
     """
     Check if Xvfb (virtual display) is running.
     
+    Args:
+        alive: Optional result of check_processes_alive() to reuse
+        
     Returns:
         bool: True if Xvfb is running, False otherwise
     """
     display = os.getenv("DISPLAY", ":99")
     
     # Check if Xvfb process is running
-    if not check_process_alive("Xvfb"):
+    if alive is None:
+        alive = check_processes_alive(["Xvfb"])
+    if not alive.get("Xvfb"):
         print(f"[smoke] ✗ Xvfb process not running")
         return False
     
@@ -108,10 +164,13 @@ def check_xvfb_alive():
         return True
 
 
-def check_pjeoffice_alive():
+def check_pjeoffice_alive(alive=None):
     """
     Check if PJeOffice process is running.
     
+    Args:
+        alive: Optional result of check_processes_alive() to reuse
+        
     Returns:
         bool: True if PJeOffice is running or not required, False if required but not running
     """
@@ -123,12 +182,14 @@ def check_pjeoffice_alive():
     
     # Check if PJeOffice is installed
     pjeoffice_path = os.getenv("PJEOFFICE_EXECUTABLE", "/opt/pjeoffice/pjeoffice-pro.sh")
-    if not os.path.exists(pjeoffice_path):
+    if not path_exists(pjeoffice_path):
         print(f"[smoke] ✗ PJeOffice not installed at {pjeoffice_path}")
         return False
     
     # Check if PJeOffice process is running
-    if check_process_alive("pjeoffice"):
+    if alive is None:
+        alive = check_processes_alive(["pjeoffice"])
+    if alive.get("pjeoffice"):
         print("[smoke] ✓ PJeOffice process is alive")
         return True
     else:
@@ -136,10 +197,13 @@ def check_pjeoffice_alive():
         return False
 
 
-def check_screen_recording():
+def check_screen_recording(alive=None):
     """
     Check if screen recording is working.
     
+    Args:
+        alive: Optional result of check_processes_alive() to reuse
+        
     Returns:
         bool: True if screen recording is working or not enabled, False if enabled but not working
     """
@@ -150,7 +214,9 @@ def check_screen_recording():
         return True
     
     # Check if FFmpeg process is running
-    if not check_process_alive("ffmpeg"):
+    if alive is None:
+        alive = check_processes_alive(["ffmpeg"])
+    if not alive.get("ffmpeg"):
         print("[smoke] ✗ FFmpeg process not running")
         return False
     
@@ -193,13 +259,15 @@ def check_processes():
     
     print("[smoke] Checking required processes...")
     
-    results = []
+    # Collect the enabled probes first so they can run concurrently:
+    # each one mostly waits on pgrep/xdpyinfo, so the waits overlap.
+    checks = []
     
     # Check Xvfb if USE_XVFB is enabled
     use_xvfb = os.getenv("USE_XVFB", "0") == "1"
     if use_xvfb:
         print("[smoke] Checking Xvfb (USE_XVFB=1)...")
-        results.append(check_xvfb_alive())
+        checks.append(("Xvfb", check_xvfb_alive))
     else:
         print("[smoke] Xvfb not enabled (USE_XVFB=0), skipping check")
     
@@ -207,7 +275,7 @@ def check_processes():
     use_pjeoffice = os.getenv("USE_PJEOFFICE", "0") == "1"
     if use_pjeoffice:
         print("[smoke] Checking PJeOffice (USE_PJEOFFICE=1)...")
-        results.append(check_pjeoffice_alive())
+        checks.append(("pjeoffice", check_pjeoffice_alive))
     else:
         print("[smoke] PJeOffice not enabled (USE_PJEOFFICE=0), skipping check")
     
@@ -215,10 +283,23 @@ def check_processes():
     use_recording = os.getenv("USE_SCREEN_RECORDING", "0") == "1"
     if use_recording:
         print("[smoke] Checking screen recording (USE_SCREEN_RECORDING=1)...")
-        results.append(check_screen_recording())
+        checks.append(("ffmpeg", check_screen_recording))
     else:
         print("[smoke] Screen recording not enabled (USE_SCREEN_RECORDING=0), skipping check")
     
+    results = []
+    if checks:
+        # One /proc scan covers every process name the probes need
+        alive = check_processes_alive([name for name, _ in checks])
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = {executor.submit(check, alive): name for name, check in checks}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"[smoke] Error running {futures[future]} check: {e}")
+                    results.append(False)
+    
     # If no processes were checked, return True
     if not results:
         print("[smoke] No processes to check")
@@ -254,7 +335,7 @@ def test_helper_scripts():
     
     # Add /app/src to path if it exists
     src_dir = pathlib.Path("/app/src")
-    if src_dir.exists() and str(src_dir) not in sys.path:
+    if path_exists(src_dir) and str(src_dir) not in sys.path:
         sys.path.insert(0, str(src_dir))
     
     try:
@@ -289,7 +370,6 @@ def test_helper_scripts():
         return False
     except Exception as e:
         print(f"[smoke] ✗ Error testing helper scripts: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -309,6 +389,9 @@ def main():
         print("[smoke] Helper scripts test failed")
         return 1
     
+    # One timestamp names every output file of this run
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    
     # Check if seleniumbase is available
     seleniumbase_available = importlib.util.find_spec("seleniumbase") is not None
     
@@ -325,7 +408,6 @@ def main():
                 driver.set_window_size(1366, 768)
                 driver.open(TARGET_URL)
                 
-                ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
                 out = CACHE_DIR / f"smoke_{ts}.png"
                 driver.save_screenshot(str(out))
                 
@@ -344,24 +426,23 @@ def main():
     
     if not seleniumbase_available:
         # Fallback to requests
+        if requests is None:
+            print("[smoke] ERRO: Nem seleniumbase nem requests estão disponíveis")
+            return 1
+        
         try:
-            import requests
-            from urllib.parse import urlparse
-            
             print("[smoke] Usando requests (fallback)")
             
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            
             # Make HTTP request
-            response = requests.get(TARGET_URL, timeout=30)
+            response = requests.get(TARGET_URL, stream=True, timeout=30)
             
-            # Save response content
+            # Stream response content to disk
             out_html = CACHE_DIR / f"smoke_{ts}.html"
-            with open(out_html, "w", encoding="utf-8") as f:
-                f.write(response.text)
+            with response:
+                html_head = save_response_head(response, out_html)
             
             # Extract title from HTML using helper function
-            title = extract_title_from_html(response.text)
+            title = extract_title_from_html(html_head)
             
             print(f"[smoke] título: {title}")
             print(f"[smoke] status code: {response.status_code}")
@@ -376,9 +457,6 @@ def main():
             
             return 0
             
-        except ImportError:
-            print("[smoke] ERRO: Nem seleniumbase nem requests estão disponíveis")
-            return 1
         except Exception as e:
             print(f"[smoke] ERRO ao usar requests: {e}")
             return 1
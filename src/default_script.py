@@ -7,12 +7,22 @@ This is used for smoke test to simulate the download scenario.
 
 import sys
 import os
+import traceback
 from pathlib import Path
 
 # Add /app/src to path if running in Docker environment
 if os.path.exists('/app/src'):
     sys.path.insert(0, '/app/src')
 
+# Import helper scripts once, after /app/src is on the path
+try:
+    import helper1
+    import helper2
+    helper_import_error = None
+except ImportError as e:
+    helper1 = helper2 = None
+    helper_import_error = e
+
 
 def main():
     """
@@ -20,11 +30,13 @@ def main():
     """
     print("[default_script] Starting default script execution")
     
-    # Try to import and use helper scripts
+    if helper_import_error is not None:
+        print(f"[default_script] Warning: Could not import helper scripts: {helper_import_error}")
+        print("[default_script] This is expected if helpers are not in /app/src")
+        return 0
+    
+    # Use helper scripts
     try:
-        import helper1
-        import helper2
-        
         test_url = 'https://example.com/test'
         test_title = '  Example   Test   Page  '
         
@@ -45,13 +57,8 @@ def main():
         print("[default_script] ✓ Successfully used helper scripts")
         return 0
         
-    except ImportError as e:
-        print(f"[default_script] Warning: Could not import helper scripts: {e}")
-        print("[default_script] This is expected if helpers are not in /app/src")
-        return 0
     except Exception as e:
         print(f"[default_script] ERROR: {e}")
-        import traceback
         traceback.print_exc()
         return 1
 
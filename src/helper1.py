@@ -4,7 +4,10 @@ Helper Script 1 - URL Validator
 Basic sample helper script for smoke test expansion.
 """
 
+import functools
 
+
+@functools.lru_cache(maxsize=1024)
 def validate_url(url):
     """
     Validate if a URL has a proper format.
@@ -15,16 +18,11 @@ def validate_url(url):
     Returns:
         bool: True if URL is valid, False otherwise
     """
-    if not url:
-        return False
-    
-    # Basic URL validation
-    if not (url.startswith('http://') or url.startswith('https://')):
-        return False
-    
-    return True
+    # Basic URL validation (startswith accepts a tuple of prefixes)
+    return bool(url) and url.startswith(('http://', 'https://'))
 
 
+@functools.lru_cache(maxsize=1024)
 def normalize_url(url):
     """
     Normalize URL by removing trailing slashes.
@@ -35,14 +33,8 @@ def normalize_url(url):
     Returns:
         str: Normalized URL
     """
-    if not url:
-        return url
-    
-    # Remove trailing slash
-    if url.endswith('/'):
-        return url.rstrip('/')
-    
-    return url
+    # Remove trailing slash (rstrip is a no-op when there is none)
+    return url.rstrip('/') if url else url
 
 
 if __name__ == "__main__":
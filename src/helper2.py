@@ -4,9 +4,11 @@ Helper Script 2 - Text Processor
 Basic sample helper script for smoke test expansion.
 """
 
+import functools
 import re
 
 
+@functools.lru_cache(maxsize=1024)
 def extract_domain(url):
     """
     Extract domain from URL.
@@ -40,16 +42,8 @@ def clean_text(text):
     Returns:
         str: Cleaned text
     """
-    if not text:
-        return text
-    
-    # Remove extra whitespace
-    cleaned = re.sub(r'\s+', ' ', text)
-    
-    # Strip leading/trailing whitespace
-    cleaned = cleaned.strip()
-    
-    return cleaned
+    # Collapse whitespace runs; split() also drops leading/trailing whitespace
+    return ' '.join(text.split()) if text else text
 
 
 def format_report(url, title, status="success"):
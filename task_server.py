@@ -16,8 +16,12 @@ Environment Variables:
 import os
 import sys
 import json
+import hmac
+import asyncio
+import functools
 import subprocess
 import threading
+import traceback
 import time
 import pathlib
 from datetime import datetime
@@ -26,19 +30,33 @@ from script_downloader import download_file, get_filename_from_url
 
 app = Flask(__name__)
 
-# Global state to track if a task is currently executing
-task_executing = False
-task_lock = threading.Lock()
+# Held while a task is executing; acquired without blocking so a second
+# task is rejected, and released by the task itself when it finishes
+task_slot = threading.Lock()
+
+# Event loop that runs task scripts, shared by all tasks
+task_loop = None
+task_loop_lock = threading.Lock()
 
 # Configuration from environment variables
 TASK_SERVER_PORT = int(os.getenv("TASK_SERVER_PORT", "8080"))
 TASK_AUTH_TOKEN = os.getenv("TASK_AUTH_TOKEN", "")
 WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "3600"))
 
+# Scripts and their payload are written to /tmp
+TEMP_DIR = pathlib.Path("/tmp")
+TASK_PAYLOAD_FILE = TEMP_DIR / "task_payload.json"
+
 
 def log_timestamp():
     """Return formatted timestamp for logging."""
-    return f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}]"
+    return f"[{time.strftime('%Y-%m-%d %H:%M:%S')}]"
+
+
+@functools.lru_cache(maxsize=1)
+def _token_bytes(token):
+    """Return the configured token encoded once for comparison."""
+    return token.encode()
 
 
 def validate_auth():
@@ -51,12 +69,12 @@ def validate_auth():
     if not TASK_AUTH_TOKEN:
         return True, None
     
-    auth_header = request.headers.get("Authorization", "")
-    if not auth_header.startswith("Bearer "):
+    scheme, sep, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme != "Bearer" or not sep:
         return False, "Missing or invalid Authorization header"
     
-    token = auth_header[7:]  # Remove "Bearer " prefix
-    if token != TASK_AUTH_TOKEN:
+    # Constant-time comparison so the token cannot be guessed by timing
+    if not hmac.compare_digest(_token_bytes(TASK_AUTH_TOKEN), token.encode()):
         return False, "Invalid authentication token"
     
     return True, None
@@ -70,39 +88,115 @@ def validate_payload(payload):
         payload: JSON payload from the request
         
     Returns:
-        tuple: (bool, str) - (is_valid, error_message)
+        tuple: (bool, str, str) - (is_valid, error_message, script_name),
+        where script_name is the filename resolved from script_url
+        (None when invalid)
     """
     # Check required fields
     if not payload:
-        return False, "Empty payload"
+        return False, "Empty payload", None
     
     if "script_url" not in payload:
-        return False, "Missing required field: script_url"
+        return False, "Missing required field: script_url", None
     
     if "script_name" not in payload:
-        return False, "Missing required field: script_name"
+        return False, "Missing required field: script_name", None
     
     script_url = payload["script_url"]
     script_name = payload["script_name"]
     
     # Validate script_url is HTTPS
     if not script_url.startswith("https://"):
-        return False, "script_url must use HTTPS protocol"
+        return False, "script_url must use HTTPS protocol", None
     
     # Validate script_name matches the URL
     url_filename = get_filename_from_url(script_url)
     if script_name != url_filename:
-        return False, f"script_name '{script_name}' does not match URL filename '{url_filename}'"
+        return False, f"script_name '{script_name}' does not match URL filename '{url_filename}'", None
     
     # Validate payload field if present
     if "payload" in payload:
         if not isinstance(payload["payload"], dict):
-            return False, "payload field must be a JSON object"
+            return False, "payload field must be a JSON object", None
     
-    return True, None
+    return True, None, url_filename
+
+
+async def run_script(script_path, timeout):
+    """
+    Run a Python script and capture its output.
+    
+    The child is awaited on the task event loop, so no thread stays
+    parked on it while it runs.
+    
+    Args:
+        script_path: Path of the script to execute
+        timeout: Maximum execution time in seconds
+        
+    Returns:
+        subprocess.CompletedProcess: Exit code and decoded stdout/stderr
+        
+    Raises:
+        subprocess.TimeoutExpired: If the script runs longer than timeout
+    """
+    args = ["python", str(script_path)]
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(args, timeout)
+    
+    return subprocess.CompletedProcess(
+        args,
+        proc.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
 
 
-def download_and_execute_script(script_url, script_name, task_payload=None):
+def _run_task_loop(loop):
+    """Run the task event loop forever in its own thread."""
+    asyncio.set_event_loop(loop)
+    while True:
+        try:
+            loop.run_forever()
+            return
+        except SystemExit:
+            # A finished task ends with sys.exit(); keep the loop alive
+            # for the next task, as a finished task thread used to.
+            continue
+
+
+def get_task_loop():
+    """
+    Return the event loop that executes tasks, starting it on first use.
+    
+    Returns:
+        asyncio.AbstractEventLoop: Loop running in a background thread
+    """
+    global task_loop
+    
+    with task_loop_lock:
+        if task_loop is None:
+            task_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_run_task_loop,
+                args=(task_loop,),
+                name="task-loop",
+                daemon=True
+            ).start()
+    
+    return task_loop
+
+
+async def download_and_execute_script(script_url, script_name, task_payload=None):
     """
     Download and execute the specified script.
     After execution completes, triggers container restart.
@@ -112,19 +206,17 @@ def download_and_execute_script(script_url, script_name, task_payload=None):
         script_name: Name of the script file
         task_payload: Optional payload to pass to the script
     """
-    global task_executing
-    
     try:
         print(f"{log_timestamp()} ⬇️  Downloading script from: {script_url}")
         
         # Download the script to /tmp
-        temp_path = pathlib.Path("/tmp")
-        destination = temp_path / script_name
+        destination = TEMP_DIR / script_name
         
         # Set SCRIPT_URL for script_downloader.py
         os.environ["SCRIPT_URL"] = script_url
         
-        # Download using script_downloader
+        # Download using script_downloader (short and blocking; only one
+        # task runs at a time, so the loop has nothing else to serve)
         if not download_file(script_url, str(destination)):
             print(f"{log_timestamp()} ❌ Failed to download script")
             return
@@ -135,9 +227,9 @@ def download_and_execute_script(script_url, script_name, task_payload=None):
         
         # If there's a payload, save it to a JSON file that the script can read
         if task_payload:
-            payload_file = temp_path / "task_payload.json"
+            payload_file = TASK_PAYLOAD_FILE
             with open(payload_file, 'w') as f:
-                json.dump(task_payload, f, indent=2)
+                json.dump(task_payload, f, separators=(",", ":"))
             os.environ["TASK_PAYLOAD_FILE"] = str(payload_file)
             print(f"{log_timestamp()} 📄 Task payload saved to: {payload_file}")
         
@@ -145,12 +237,7 @@ def download_and_execute_script(script_url, script_name, task_payload=None):
         
         # Execute the script with timeout
         try:
-            result = subprocess.run(
-                ["python", str(destination)],
-                timeout=WORKER_TIMEOUT,
-                capture_output=True,
-                text=True
-            )
+            result = await run_script(destination, WORKER_TIMEOUT)
             
             if result.returncode == 0:
                 print(f"{log_timestamp()} ✅ Script completed successfully")
@@ -165,7 +252,7 @@ def download_and_execute_script(script_url, script_name, task_payload=None):
         print(f"{log_timestamp()} 🔄 Triggering container restart...")
         
         # Wait a moment to ensure logs are flushed
-        time.sleep(2)
+        await asyncio.sleep(2)
         
         # Exit with code 0 to trigger container restart (if restart policy is set)
         # The container orchestrator (Docker, Kubernetes) will restart the container
@@ -173,17 +260,15 @@ def download_and_execute_script(script_url, script_name, task_payload=None):
         
     except Exception as e:
         print(f"{log_timestamp()} ❌ Error executing script: {e}")
-        import traceback
         traceback.print_exc()
         
         # Still trigger restart even on error to clear memory
         print(f"{log_timestamp()} 🔄 Triggering container restart after error...")
-        time.sleep(2)
+        await asyncio.sleep(2)
         sys.exit(1)
     
     finally:
-        with task_lock:
-            task_executing = False
+        task_slot.release()
 
 
 @app.route('/health', methods=['GET'])
@@ -192,7 +277,7 @@ def health():
     return jsonify({
         "status": "healthy",
         "mode": "standby",
-        "task_executing": task_executing,
+        "task_executing": task_slot.locked(),
         "timestamp": datetime.now().isoformat()
     }), 200
 
@@ -214,8 +299,6 @@ def receive_task():
     Returns:
         JSON response with status
     """
-    global task_executing
-    
     print(f"{log_timestamp()} 🚀 Task received")
     
     # Validate authentication
@@ -224,52 +307,47 @@ def receive_task():
         print(f"{log_timestamp()} ❌ Authentication failed: {auth_error}")
         return jsonify({"error": auth_error}), 401
     
-    # Check if another task is already executing
-    with task_lock:
-        if task_executing:
-            print(f"{log_timestamp()} ⚠️  Task already executing")
-            return jsonify({
-                "error": "Another task is already executing",
-                "status": "conflict"
-            }), 409
-        
-        # Mark as executing
-        task_executing = True
+    # Claim the task slot, or reject if another task is already executing
+    if not task_slot.acquire(blocking=False):
+        print(f"{log_timestamp()} ⚠️  Task already executing")
+        return jsonify({
+            "error": "Another task is already executing",
+            "status": "conflict"
+        }), 409
     
+    scheduled = False
     try:
         # Get JSON payload
         try:
             payload = request.get_json()
         except Exception as e:
-            with task_lock:
-                task_executing = False
+            task_slot.release()
             print(f"{log_timestamp()} ❌ Invalid JSON: {e}")
             return jsonify({"error": f"Invalid JSON: {str(e)}"}), 400
         
         # Validate payload
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         if not valid:
-            with task_lock:
-                task_executing = False
+            task_slot.release()
             print(f"{log_timestamp()} ❌ Invalid payload: {error}")
             return jsonify({"error": error}), 400
         
+        # script_name is the filename resolved from the URL during validation
         script_url = payload["script_url"]
-        script_name = payload["script_name"]
         task_payload = payload.get("payload")
         
         print(f"{log_timestamp()} ✅ Task validated successfully")
         print(f"{log_timestamp()} 📝 Script URL: {script_url}")
         print(f"{log_timestamp()} 📝 Script Name: {script_name}")
         
-        # Start execution in a background thread
+        # Schedule execution on the background task loop
         # This allows us to return immediately while the script executes
-        execution_thread = threading.Thread(
-            target=download_and_execute_script,
-            args=(script_url, script_name, task_payload),
-            daemon=True
+        # The task releases the slot itself once it finishes
+        asyncio.run_coroutine_threadsafe(
+            download_and_execute_script(script_url, script_name, task_payload),
+            get_task_loop()
         )
-        execution_thread.start()
+        scheduled = True
         
         return jsonify({
             "status": "accepted",
@@ -279,10 +357,9 @@ def receive_task():
         }), 202
         
     except Exception as e:
-        with task_lock:
-            task_executing = False
+        if not scheduled:
+            task_slot.release()
         print(f"{log_timestamp()} ❌ Error processing task: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
@@ -301,13 +378,22 @@ def main():
     print(f"{log_timestamp()} 💡 Ready to receive tasks at POST /task")
     print(f"{log_timestamp()} 💡 Health check available at GET /health")
     
-    # Run Flask server
-    app.run(
-        host='0.0.0.0',
-        port=TASK_SERVER_PORT,
-        debug=False,
-        threaded=True
-    )
+    # Serve with waitress (production WSGI server) when installed
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    
+    if serve is not None:
+        serve(app, host='0.0.0.0', port=TASK_SERVER_PORT, threads=4)
+    else:
+        print(f"{log_timestamp()} ⚠️  waitress not installed, using Flask development server")
+        app.run(
+            host='0.0.0.0',
+            port=TASK_SERVER_PORT,
+            debug=False,
+            threaded=True
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+Pytest cases for test_browser_drivers.py.
+
+test_browser_drivers.py stays a standalone script (CI runs it with plain
+python); the fixture-based WebDriver tests and the unit tests for its
+helpers live here so the script itself needs neither pytest nor
+unittest.mock.
+"""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from test_browser_drivers import (
+    SPECS,
+    BrowserSpec,
+    _clear_probe_cache,
+    _have_x,
+    _is_available,
+    _load_selenium,
+    _new_driver,
+    _resolve,
+    _run_fast,
+    _run_title_check,
+    _shared_chromedriver_url,
+    check_driver_available,
+)
+
+
+@pytest.fixture(params=list(SPECS))
+def browser(request):
+    """(spec, binary) for each browser whose driver and binary are installed."""
+    spec = SPECS[request.param]
+    if not _load_selenium():
+        pytest.skip("selenium not installed")
+    if not _is_available(spec.driver_command):
+        pytest.skip(f"{spec.driver_name} not available")
+    binary = next((_resolve(command) for _, command in spec.browser_commands
+                   if _is_available(command)), None)
+    if binary is None:
+        pytest.skip(f"{spec.name} not available")
+    return spec, binary
+
+
+def _fixture_driver(spec: BrowserSpec, binary: str, headless: bool):
+    """Start a driver for a pytest case; Chromium cases share one chromedriver."""
+    driver_path = _resolve(spec.driver_command)
+    url = None
+    if spec.family == "chromium":
+        url = _shared_chromedriver_url(driver_path)
+    return _new_driver(spec, binary, driver_path, headless, subprocess.DEVNULL, command_executor=url)
+
+
+@pytest.fixture
+def headless_driver(browser):
+    spec, binary = browser
+    driver = _fixture_driver(spec, binary, True)
+    yield spec, driver
+    driver.quit()
+
+
+@pytest.fixture
+def headful_driver(browser):
+    if not _have_x():
+        pytest.skip("No X server detected")
+    spec, binary = browser
+    driver = _fixture_driver(spec, binary, False)
+    yield spec, driver
+    driver.quit()
+
+
+def test_webdriver_headless(headless_driver):
+    spec, driver = headless_driver
+    expected_title = f"{spec.name} WebDriver Test"
+    assert expected_title in _run_title_check(driver, expected_title)
+
+
+@pytest.mark.requires_display
+def test_webdriver_headful(headful_driver):
+    spec, driver = headful_driver
+    expected_title = f"{spec.name} WebDriver Headful Test"
+    assert expected_title in _run_title_check(driver, expected_title)
+
+
+# Unit tests for the probe and subprocess helpers
+def test_probe_cache_runs_version_once():
+    """Repeated checks of the same binary spawn `--version` only once."""
+    _clear_probe_cache()
+    completed = subprocess.CompletedProcess([], 0, stdout=b"FakeDriver 1.0\n")
+    try:
+        with patch.object(subprocess, "run", return_value=completed) as run:
+            for _ in range(3):
+                assert check_driver_available("Python", sys.executable, lambda *a: None,
+                                              need_version=True)
+        assert run.call_count == 1
+    finally:
+        _clear_probe_cache()
+
+
+def test_run_fast_exit_code_and_timeout():
+    assert _run_fast([sys.executable, "-c", "raise SystemExit(3)"], timeout=10) == 3
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run_fast([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2)
@@ -4,23 +4,161 @@ Test script for Caddy reverse proxy configuration.
 Validates the Caddy setup files and configurations.
 """
 
+import argparse
+import functools
+import hashlib
+import json
 import os
 import sys
 import yaml
 
+# libyaml's C parser when PyYAML was built with it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
+# Directory holding this test file and the repo files it checks
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _read_bytes(path, missing_msg):
+    """Read a repo file undecoded, failing the test with `missing_msg` if absent.
+
+    Every check below looks for ASCII literals, so bytes avoid decoding the file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise AssertionError(missing_msg) from None
+
+
+# With --cache, main() loads {test name: sha256 of its input file} for the
+# checks that passed last time; None (the default, and under pytest) disables it
+_FINGERPRINTS_PATH = os.path.join(_HERE, '.pytest_cache', 'caddy_fingerprints.json')
+_fingerprints = None
+
+
+def _cached_by(filename):
+    """Skip the decorated check when `filename` is unchanged since it last passed."""
+    def decorate(test):
+        @functools.wraps(test)
+        def wrapper():
+            if _fingerprints is None:
+                return test()
+            try:
+                with open(os.path.join(_HERE, filename), 'rb') as f:
+                    # Hash this module too, so edited checks are never skipped
+                    digest = hashlib.sha256(_own_source() + f.read()).hexdigest()
+            except FileNotFoundError:
+                return test()  # let the check itself report the missing file
+            if _fingerprints.get(test.__name__) == digest:
+                print(f"Skipping {test.__name__}: {filename} unchanged since it last passed\n")
+                return
+            test()
+            _fingerprints[test.__name__] = digest
+        return wrapper
+    return decorate
+
+
+@functools.lru_cache(maxsize=1)
+def _own_source():
+    with open(__file__, 'rb') as f:
+        return f.read()
+
+
+def _load_fingerprints():
+    try:
+        with open(_FINGERPRINTS_PATH, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_fingerprints():
+    os.makedirs(os.path.dirname(_FINGERPRINTS_PATH), exist_ok=True)
+    with open(_FINGERPRINTS_PATH, 'w') as f:
+        json.dump(_fingerprints, f, indent=2)
+
+
+def _missing_literals(content, literals):
+    """Return the `literals` that do not occur in `content`.
+
+    Each literal gets its own `in` scan, so overlapping literals
+    (e.g. 'Setup with Caddy' and 'Caddyfile') are all found.
+    """
+    return [literal for literal in literals if literal.encode() not in content]
+
+
+# Key Caddyfile directives and the VNC_CADDY_PROXY.md sections to look for
+_CADDYFILE_CHECKS = (
+    (':5901', 'Port configuration'),
+    ('reverse_proxy', 'Reverse proxy directive'),
+    ('rpa-worker-vnc:5900', 'VNC backend reference'),
+    ('header_up Upgrade', 'WebSocket support (Upgrade header)'),
+    ('header_up Connection', 'WebSocket support (Connection header)'),
+)
+
+_DOC_SECTIONS = (
+    'Caddy Reverse Proxy',
+    'Why Use a Reverse Proxy',
+    'Prerequisites',
+    'Setup with Caddy',
+    'docker-compose.caddy.yml',
+    'Caddyfile',
+    'Usage Instructions',
+    'Security Best Practices',
+    'HTTPS',
+    'Authentication',
+    'Troubleshooting',
+    'noVNC',
+)
+
+def _tk_in_python_section(content):
+    """Check python3-tk appears in the Python build tools section.
+
+    The section starts at the 'Python and build tools' marker (or the
+    python3-dev line) and ends at the next comment line that does not
+    mention Python.
+    """
+    found_python_section = False
+    for line in content.split(b'\n'):
+        if b'Python and build tools' in line or b'python3-dev' in line:
+            found_python_section = True
+        if found_python_section and b'python3-tk' in line:
+            return True
+        if found_python_section and line.strip().startswith(b'#') and b'Python' not in line:
+            return False  # Moved to next section
+    return False
+
+
+# (Dockerfile snippet, python3-tk in the Python section?, case description)
+_TK_SECTION_CASES = [
+    (b'# Python and build tools\nRUN apt install python3-dev \\\n    python3-tk\n',
+     True, "python3-tk on its own line"),
+    (b'RUN apt install python3-tk python3-dev\n',
+     True, "python3-tk on the python3-dev line"),
+    (b'# Python and build tools\nRUN apt install python3-dev\n# Fonts\nRUN apt install fonts-liberation\n'
+     b'# Python extras\nRUN apt install python3-tk\n',
+     False, "python3-tk after an unrelated section"),
+    (b'RUN apt install python3-tk\n',
+     False, "python3-tk without a Python section"),
+]
+
+
+@_cached_by('docker-compose.caddy.yml')
 def test_docker_compose_caddy():
     """Test docker-compose.caddy.yml structure."""
     print("Testing docker-compose.caddy.yml...")
     
-    compose_path = os.path.join(os.path.dirname(__file__), 'docker-compose.caddy.yml')
+    compose_path = os.path.join(_HERE, 'docker-compose.caddy.yml')
     
-    assert os.path.exists(compose_path), "docker-compose.caddy.yml not found"
+    content = _read_bytes(compose_path, "docker-compose.caddy.yml not found")
     print("  ✓ docker-compose.caddy.yml exists")
     
     # Load and validate YAML
-    with open(compose_path, 'r') as f:
-        compose = yaml.safe_load(f)
+    compose = yaml.load(content, Loader=_Loader)
     
     assert 'services' in compose, "services section not found"
     print("  ✓ Valid YAML structure")
@@ -35,7 +173,8 @@ def test_docker_compose_caddy():
     rpa_worker = compose['services']['rpa-worker-vnc']
     assert 'environment' in rpa_worker, "rpa-worker-vnc missing environment"
     env = rpa_worker['environment']
-    env_dict = {e.split('=')[0]: e.split('=')[1] for e in env}
+    # Split once, on the first '=', so values may themselves contain '='
+    env_dict = dict(e.split('=', 1) for e in env if '=' in e)
     
     assert env_dict.get('USE_XVFB') == '1', "USE_XVFB not enabled"
     assert env_dict.get('USE_VNC') == '1', "USE_VNC not enabled"
@@ -64,180 +203,158 @@ def test_docker_compose_caddy():
     print("✓ All docker-compose.caddy.yml tests passed!\n")
 
 
+@_cached_by('Caddyfile')
 def test_caddyfile_exists():
     """Test Caddyfile exists and has basic structure."""
     print("Testing Caddyfile...")
     
-    caddyfile_path = os.path.join(os.path.dirname(__file__), 'Caddyfile')
+    caddyfile_path = os.path.join(_HERE, 'Caddyfile')
     
-    assert os.path.exists(caddyfile_path), "Caddyfile not found"
+    content = _read_bytes(caddyfile_path, "Caddyfile not found")
     print("  ✓ Caddyfile exists")
     
-    with open(caddyfile_path, 'r') as f:
-        content = f.read()
-    
     # Check for key configurations
-    checks = [
-        (':5901', 'Port configuration'),
-        ('reverse_proxy', 'Reverse proxy directive'),
-        ('rpa-worker-vnc:5900', 'VNC backend reference'),
-        ('header_up Upgrade', 'WebSocket support (Upgrade header)'),
-        ('header_up Connection', 'WebSocket support (Connection header)'),
-    ]
-    
-    for check_str, description in checks:
-        assert check_str in content, f"{description} not found in Caddyfile"
+    missing = _missing_literals(content, [check_str for check_str, _ in _CADDYFILE_CHECKS])
+    for check_str, description in _CADDYFILE_CHECKS:
+        assert check_str not in missing, f"{description} not found in Caddyfile"
         print(f"  ✓ {description} present")
     
     print("✓ All Caddyfile tests passed!\n")
 
 
+@_cached_by('VNC_CADDY_PROXY.md')
 def test_caddy_documentation():
     """Test VNC_CADDY_PROXY.md documentation."""
     print("Testing VNC_CADDY_PROXY.md...")
     
-    doc_path = os.path.join(os.path.dirname(__file__), 'VNC_CADDY_PROXY.md')
+    doc_path = os.path.join(_HERE, 'VNC_CADDY_PROXY.md')
     
-    assert os.path.exists(doc_path), "VNC_CADDY_PROXY.md not found"
+    content = _read_bytes(doc_path, "VNC_CADDY_PROXY.md not found")
     print("  ✓ VNC_CADDY_PROXY.md exists")
     
-    with open(doc_path, 'r') as f:
-        content = f.read()
-    
     # Check for essential sections
-    sections = [
-        'Caddy Reverse Proxy',
-        'Why Use a Reverse Proxy',
-        'Prerequisites',
-        'Setup with Caddy',
-        'docker-compose.caddy.yml',
-        'Caddyfile',
-        'Usage Instructions',
-        'Security Best Practices',
-        'HTTPS',
-        'Authentication',
-        'Troubleshooting',
-        'noVNC',
-    ]
-    
-    for section in sections:
-        assert section in content, f"Section '{section}' not found in documentation"
+    missing = _missing_literals(content, _DOC_SECTIONS)
+    for section in _DOC_SECTIONS:
+        assert section not in missing, f"Section '{section}' not found in documentation"
         print(f"  ✓ {section} section present")
     
     # Check for code examples
-    assert '```yaml' in content, "YAML code examples not found"
-    assert '```bash' in content, "Bash code examples not found"
-    assert '```caddyfile' in content, "Caddyfile examples not found"
+    assert b'```yaml' in content, "YAML code examples not found"
+    assert b'```bash' in content, "Bash code examples not found"
+    assert b'```caddyfile' in content, "Caddyfile examples not found"
     print("  ✓ Code examples present")
     
     # Check for security warnings
-    assert 'password' in content.lower() or 'authentication' in content.lower(), \
+    assert b'password' in content.lower() or b'authentication' in content.lower(), \
         "Security/authentication information not found"
     print("  ✓ Security information present")
     
     print("✓ All VNC_CADDY_PROXY.md tests passed!\n")
 
 
+def test_missing_literals_overlapping():
+    """Overlapping literals are each found independently."""
+    print("Testing overlapping literal checks...")
+    
+    content = b'Setup with Caddyfile'
+    assert _missing_literals(content, ('Setup with Caddy', 'Caddyfile')) == []
+    assert _missing_literals(content, ('Caddy', 'Caddyfile', 'noVNC')) == ['noVNC']
+    print("  ✓ Overlapping literals all found")
+    
+    print("✓ All overlapping literal tests passed!\n")
+
+
+@_cached_by('README.md')
 def test_readme_caddy_reference():
     """Test that README.md references Caddy documentation."""
     print("Testing README.md Caddy references...")
     
-    readme_path = os.path.join(os.path.dirname(__file__), 'README.md')
+    readme_path = os.path.join(_HERE, 'README.md')
     
-    with open(readme_path, 'r') as f:
-        content = f.read()
+    content = _read_bytes(readme_path, "README.md not found")
     
     # Check for Caddy references
-    assert 'VNC_CADDY_PROXY.md' in content, "VNC_CADDY_PROXY.md not referenced in README"
+    assert b'VNC_CADDY_PROXY.md' in content, "VNC_CADDY_PROXY.md not referenced in README"
     print("  ✓ VNC_CADDY_PROXY.md referenced in README")
     
-    assert 'docker-compose.caddy.yml' in content or 'Caddy' in content, \
+    assert b'docker-compose.caddy.yml' in content or b'Caddy' in content, \
         "Caddy not mentioned in README"
     print("  ✓ Caddy mentioned in README")
     
     print("✓ All README Caddy reference tests passed!\n")
 
 
+def test_tk_section_detection():
+    """Test python3-tk section detection on sample Dockerfile snippets."""
+    print("Testing python3-tk section detection...")
+    
+    for content, expected, description in _TK_SECTION_CASES:
+        assert _tk_in_python_section(content) is expected, f"Failed: {description}"
+        print(f"  ✓ {description}")
+    
+    print("✓ All python3-tk section detection tests passed!\n")
+
+
+@_cached_by('Dockerfile.trixie')
 def test_dockerfile_trixie_tkinter():
     """Test that Dockerfile.trixie includes python3-tk."""
     print("Testing Dockerfile.trixie tkinter fix...")
 
-    dockerfile_path = os.path.join(os.path.dirname(__file__), 'Dockerfile.trixie')
-
-    assert os.path.exists(dockerfile_path), "Dockerfile.trixie not found"
+    dockerfile_path = os.path.join(_HERE, 'Dockerfile.trixie')
 
-    with open(dockerfile_path, 'r') as f:
-        content = f.read()
+    content = _read_bytes(dockerfile_path, "Dockerfile.trixie not found")
 
     # Check for python3-tk
-    assert 'python3-tk' in content, "python3-tk not found in Dockerfile.trixie"
+    assert b'python3-tk' in content, "python3-tk not found in Dockerfile.trixie"
     print("  ✓ python3-tk package included")
 
     # Check it's in the Python section
-    lines = content.split('\n')
-    found_python_section = False
-    found_tk = False
-
-    for i, line in enumerate(lines):
-        if 'Python and build tools' in line or 'python3-dev' in line:
-            found_python_section = True
-        if found_python_section and 'python3-tk' in line:
-            found_tk = True
-            break
-        if found_python_section and line.strip() and line.strip().startswith('#') and 'Python' not in line:
-            break  # Moved to next section
-
+    found_tk = _tk_in_python_section(content)
     assert found_tk, "python3-tk not in Python tools section"
     print("  ✓ python3-tk in correct section (Python build tools)")
 
     # Verify python3-dev is still there
-    assert 'python3-dev' in content, "python3-dev missing (should still be present)"
+    assert b'python3-dev' in content, "python3-dev missing (should still be present)"
     print("  ✓ python3-dev still present")
 
     print("✓ All Dockerfile.trixie tkinter tests passed!\n")
 
 
+@_cached_by('Dockerfile.slim')
 def test_dockerfile_slim_tkinter():
     """Test that Dockerfile.slim includes python3-tk."""
     print("Testing Dockerfile.slim tkinter fix...")
 
-    dockerfile_path = os.path.join(os.path.dirname(__file__), 'Dockerfile.slim')
-
-    assert os.path.exists(dockerfile_path), "Dockerfile.slim not found"
+    dockerfile_path = os.path.join(_HERE, 'Dockerfile.slim')
 
-    with open(dockerfile_path, 'r') as f:
-        content = f.read()
+    content = _read_bytes(dockerfile_path, "Dockerfile.slim not found")
 
     # Check for python3-tk
-    assert 'python3-tk' in content, "python3-tk not found in Dockerfile.slim"
+    assert b'python3-tk' in content, "python3-tk not found in Dockerfile.slim"
     print("  ✓ python3-tk package included")
 
     # Check it's in the Python section
-    lines = content.split('\n')
-    found_python_section = False
-    found_tk = False
-
-    for i, line in enumerate(lines):
-        if 'Python and build tools' in line or 'python3-dev' in line:
-            found_python_section = True
-        if found_python_section and 'python3-tk' in line:
-            found_tk = True
-            break
-        if found_python_section and line.strip() and line.strip().startswith('#') and 'Python' not in line:
-            break  # Moved to next section
-
+    found_tk = _tk_in_python_section(content)
     assert found_tk, "python3-tk not in Python tools section"
     print("  ✓ python3-tk in correct section (Python build tools)")
 
     # Verify python3-dev is still there
-    assert 'python3-dev' in content, "python3-dev missing (should still be present)"
+    assert b'python3-dev' in content, "python3-dev missing (should still be present)"
     print("  ✓ python3-dev still present")
 
     print("✓ All Dockerfile.slim tkinter tests passed!\n")
 
 
-def main():
+def main(argv=None):
     """Run all tests."""
+    global _fingerprints
+    parser = argparse.ArgumentParser(description="Caddy reverse proxy configuration tests")
+    parser.add_argument("--cache", action="store_true",
+                        help="skip checks whose input file is unchanged since they last passed")
+    args = parser.parse_args(argv)
+    if args.cache:
+        _fingerprints = _load_fingerprints()
+
     print("=" * 70)
     print("Caddy Reverse Proxy Configuration Test Suite")
     print("=" * 70)
@@ -247,7 +364,9 @@ def main():
         test_docker_compose_caddy()
         test_caddyfile_exists()
         test_caddy_documentation()
+        test_missing_literals_overlapping()
         test_readme_caddy_reference()
+        test_tk_section_detection()
         test_dockerfile_trixie_tkinter()
         test_dockerfile_slim_tkinter()
         
@@ -270,6 +389,9 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if _fingerprints is not None:
+            _save_fingerprints()
 
 
 if __name__ == "__main__":
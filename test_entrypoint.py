@@ -3,39 +3,59 @@
 Test script to validate entrypoint.sh logic and environment variables
 """
 import os
+import glob
+import functools
 import subprocess
 import sys
 
-def run_bash_script_check(script_path):
-    """Check if bash script has valid syntax"""
+@functools.lru_cache(maxsize=None)
+def _load(path):
+    """Read a file once per run as bytes; the checks below share the cached
+    content and search it with bytes needles, so nothing is decoded"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+def validate_bash_batch(script_paths):
+    """Check the bash syntax of several scripts from a single bash process
+
+    Returns a dict mapping each path to True (valid) or False.
+    """
     try:
         result = subprocess.run(
-            ['bash', '-n', script_path],
+            ['bash', '-c', 'for f in "$@"; do bash -n "$f" && echo "OK:$f" || echo "BAD:$f"; done',
+             '_', *script_paths],
             capture_output=True,
             text=True
         )
-        if result.returncode == 0:
-            print(f"✓ {script_path} has valid bash syntax")
-            return True
-        else:
-            print(f"✗ {script_path} has syntax errors:")
-            print(result.stderr)
-            return False
     except Exception as e:
-        print(f"✗ Error checking {script_path}: {e}")
-        return False
+        print(f"✗ Error checking {', '.join(script_paths)}: {e}")
+        return dict.fromkeys(script_paths, False)
+
+    status = dict.fromkeys(script_paths, False)
+    for line in result.stdout.splitlines():
+        verdict, _, path = line.partition(':')
+        if path in status:
+            status[path] = verdict == 'OK'
+    for path, ok in status.items():
+        if ok:
+            print(f"✓ {path} has valid bash syntax")
+        else:
+            print(f"✗ {path} has syntax errors")
+    if result.stderr:
+        # bash -n prefixes each error with the offending file name
+        print(result.stderr.rstrip())
+    return status
 
 def check_dockerfile_args(dockerfile_path):
     """Check if Dockerfile has BUILD_PJEOFFICE argument"""
     try:
-        with open(dockerfile_path, 'r') as f:
-            content = f.read()
-            if 'ARG BUILD_PJEOFFICE' in content:
-                print(f"✓ {dockerfile_path} has BUILD_PJEOFFICE argument")
-                return True
-            else:
-                print(f"✗ {dockerfile_path} missing BUILD_PJEOFFICE argument")
-                return False
+        content = _load(dockerfile_path)
+        if b'ARG BUILD_PJEOFFICE' in content:
+            print(f"✓ {dockerfile_path} has BUILD_PJEOFFICE argument")
+            return True
+        else:
+            print(f"✗ {dockerfile_path} missing BUILD_PJEOFFICE argument")
+            return False
     except Exception as e:
         print(f"✗ Error reading {dockerfile_path}: {e}")
         return False
@@ -43,14 +63,13 @@ def check_dockerfile_args(dockerfile_path):
 def check_dockerfile_env_vars(dockerfile_path):
     """Check if Dockerfile has USE_PJEOFFICE environment variable"""
     try:
-        with open(dockerfile_path, 'r') as f:
-            content = f.read()
-            if 'USE_PJEOFFICE' in content:
-                print(f"✓ {dockerfile_path} has USE_PJEOFFICE environment variable")
-                return True
-            else:
-                print(f"✗ {dockerfile_path} missing USE_PJEOFFICE environment variable")
-                return False
+        content = _load(dockerfile_path)
+        if b'USE_PJEOFFICE' in content:
+            print(f"✓ {dockerfile_path} has USE_PJEOFFICE environment variable")
+            return True
+        else:
+            print(f"✗ {dockerfile_path} missing USE_PJEOFFICE environment variable")
+            return False
     except Exception as e:
         print(f"✗ Error reading {dockerfile_path}: {e}")
         return False
@@ -58,14 +77,13 @@ def check_dockerfile_env_vars(dockerfile_path):
 def check_dockerfile_pjeoffice_install(dockerfile_path):
     """Check if Dockerfile has conditional PJeOffice installation"""
     try:
-        with open(dockerfile_path, 'r') as f:
-            content = f.read()
-            if 'pje-office.pje.jus.br' in content and 'if [ "$BUILD_PJEOFFICE"' in content:
-                print(f"✓ {dockerfile_path} has conditional PJeOffice installation")
-                return True
-            else:
-                print(f"✗ {dockerfile_path} missing conditional PJeOffice installation")
-                return False
+        content = _load(dockerfile_path)
+        if b'pje-office.pje.jus.br' in content and b'if [ "$BUILD_PJEOFFICE"' in content:
+            print(f"✓ {dockerfile_path} has conditional PJeOffice installation")
+            return True
+        else:
+            print(f"✗ {dockerfile_path} missing conditional PJeOffice installation")
+            return False
     except Exception as e:
         print(f"✗ Error reading {dockerfile_path}: {e}")
         return False
@@ -81,16 +99,15 @@ def check_entrypoint_functions(entrypoint_path):
     ]
     
     try:
-        with open(entrypoint_path, 'r') as f:
-            content = f.read()
-            all_found = True
-            for func in required_functions:
-                if f'{func}()' in content:
-                    print(f"  ✓ Function {func} found")
-                else:
-                    print(f"  ✗ Function {func} not found")
-                    all_found = False
-            return all_found
+        content = _load(entrypoint_path)
+        all_found = True
+        for func in required_functions:
+            if f'{func}()'.encode() in content:
+                print(f"  ✓ Function {func} found")
+            else:
+                print(f"  ✗ Function {func} not found")
+                all_found = False
+        return all_found
     except Exception as e:
         print(f"✗ Error reading {entrypoint_path}: {e}")
         return False
@@ -100,16 +117,15 @@ def check_entrypoint_env_checks(entrypoint_path):
     env_vars = ['USE_XVFB', 'USE_OPENBOX', 'USE_PJEOFFICE']
     
     try:
-        with open(entrypoint_path, 'r') as f:
-            content = f.read()
-            all_found = True
-            for var in env_vars:
-                if var in content:
-                    print(f"  ✓ Environment variable {var} is checked")
-                else:
-                    print(f"  ✗ Environment variable {var} not checked")
-                    all_found = False
-            return all_found
+        content = _load(entrypoint_path)
+        all_found = True
+        for var in env_vars:
+            if var.encode() in content:
+                print(f"  ✓ Environment variable {var} is checked")
+            else:
+                print(f"  ✗ Environment variable {var} not checked")
+                all_found = False
+        return all_found
     except Exception as e:
         print(f"✗ Error reading {entrypoint_path}: {e}")
         return False
@@ -119,16 +135,15 @@ def check_pjeoffice_env_vars(entrypoint_path):
     pjeoffice_env_vars = ['PJEOFFICE_CONFIG_DIR', 'PJEOFFICE_CONFIG_FILE', 'PJEOFFICE_EXECUTABLE']
     
     try:
-        with open(entrypoint_path, 'r') as f:
-            content = f.read()
-            all_found = True
-            for var in pjeoffice_env_vars:
-                if var in content:
-                    print(f"  ✓ PJeOffice environment variable {var} is defined")
-                else:
-                    print(f"  ✗ PJeOffice environment variable {var} not defined")
-                    all_found = False
-            return all_found
+        content = _load(entrypoint_path)
+        all_found = True
+        for var in pjeoffice_env_vars:
+            if var.encode() in content:
+                print(f"  ✓ PJeOffice environment variable {var} is defined")
+            else:
+                print(f"  ✗ PJeOffice environment variable {var} not defined")
+                all_found = False
+        return all_found
     except Exception as e:
         print(f"✗ Error reading {entrypoint_path}: {e}")
         return False
@@ -142,8 +157,11 @@ def main():
     results = []
     
     # Test entrypoint.sh
-    print("\n1. Testing entrypoint.sh syntax...")
-    results.append(run_bash_script_check('entrypoint.sh'))
+    print("\n1. Testing shell script syntax...")
+    scripts = sorted(glob.glob('*.sh'))
+    if 'entrypoint.sh' not in scripts:
+        scripts.insert(0, 'entrypoint.sh')
+    results.extend(validate_bash_batch(scripts).values())
     
     print("\n2. Testing entrypoint.sh functions...")
     results.append(check_entrypoint_functions('entrypoint.sh'))
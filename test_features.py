@@ -4,111 +4,135 @@ Test script for RPA Worker Selenium features.
 Tests the script downloader and smoke test functionality.
 """
 
-import os
+import re
+import ast
 import sys
-import tempfile
+import functools
 import pathlib
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
+
+import pytest
+
+from fixture_runner import script_fixtures
+
+
+# Directory holding this test file and the repo scripts it checks
+_HERE = pathlib.Path(__file__).resolve().parent
+
+_FILENAME_CASES = [
+    ('https://example.com/script.py', 'script.py'),
+    ('https://example.com/path/to/my_script.py', 'my_script.py'),
+    ('https://raw.githubusercontent.com/user/repo/main/test.py', 'test.py'),
+]
+
+
+@pytest.mark.parametrize("url,expected", _FILENAME_CASES)
+def test_get_filename_from_url(url, expected):
+    """Test filename extraction from a script URL."""
+    from script_downloader import get_filename_from_url
+    
+    result = get_filename_from_url(url)
+    assert result == expected, f"Failed: {url} -> {result} (expected {expected})"
+    print(f"  ✓ get_filename_from_url('{url}') = '{result}'")
 
 
 def test_script_downloader():
     """Test script downloader functionality."""
     print("Testing script_downloader.py...")
     
-    from script_downloader import get_filename_from_url, download_helper_scripts
+    from script_downloader import get_filename_from_url
     
-    # Test 1: Filename extraction
-    test_cases = [
-        ('https://example.com/script.py', 'script.py'),
-        ('https://example.com/path/to/my_script.py', 'my_script.py'),
-        ('https://raw.githubusercontent.com/user/repo/main/test.py', 'test.py'),
-    ]
-    
-    for url, expected in test_cases:
-        result = get_filename_from_url(url)
-        assert result == expected, f"Failed: {url} -> {result} (expected {expected})"
-        print(f"  ✓ get_filename_from_url('{url}') = '{result}'")
-    
-    # Test 2: Filename extraction for URL without .py extension
+    # Filename extraction for URL without .py extension
     url_no_ext = 'https://example.com/test'
     result = get_filename_from_url(url_no_ext)
     assert result.startswith('script_'), f"Failed: {url_no_ext} -> {result}"
     assert result.endswith('.py'), f"Failed: {url_no_ext} -> {result}"
     print(f"  ✓ get_filename_from_url('{url_no_ext}') = '{result}' (generated)")
     
-    # Test 3: Helper URLs parsing
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Test with empty string
-        result = download_helper_scripts("", tmpdir)
-        assert result == [], f"Failed: empty string should return []"
-        print(f"  ✓ download_helper_scripts('', ...) = []")
-        
-        # Test with None
-        result = download_helper_scripts(None, tmpdir)
-        assert result == [], f"Failed: None should return []"
-        print(f"  ✓ download_helper_scripts(None, ...) = []")
-    
     print("✓ All script_downloader tests passed!\n")
 
 
-def test_smoke_test_title_extraction():
+# Empty HELPER_URLS values that must not trigger any download
+_EMPTY_HELPER_URLS = ["", None]
+
+
+@pytest.mark.parametrize("value", _EMPTY_HELPER_URLS)
+def test_download_helper_scripts_empty(value, tmp_path):
+    """download_helper_scripts returns [] for an empty helper URL list."""
+    from script_downloader import download_helper_scripts
+    
+    result = download_helper_scripts(value, str(tmp_path))
+    assert result == [], f"Failed: {value!r} should return []"
+    print(f"  ✓ download_helper_scripts({value!r}, ...) = []")
+
+
+# (html, expected title, case description)
+_TITLE_CASES = [
+    ('<html><head><title>Test Title</title></head><body>Test</body></html>',
+     "Test Title", "Title extraction"),
+    ('<html><body>No title</body></html>',
+     "Desconhecido", "No title case"),
+    ('<html><head><title></title></head><body>Test</body></html>',
+     "Desconhecido", "Empty title case"),
+    ('<html><head><title>  Spaced  Title  </title></head><body>Test</body></html>',
+     "Spaced Title", "Whitespace title case"),
+    ('<html><head><title>Multi\nLine\nTitle</title></head><body>Test</body></html>',
+     "Multi Line Title", "Newlines in title case"),
+    ('<html><head><TITLE>Uppercase Title</TITLE></head><body>Test</body></html>',
+     "Uppercase Title", "Case-insensitive title"),
+]
+
+
+@pytest.mark.parametrize("html,expected,description", _TITLE_CASES,
+                         ids=[description for _, _, description in _TITLE_CASES])
+def test_smoke_test_title_extraction(html, expected, description, shared_cache_dir):
     """Test smoke test title extraction logic."""
-    print("Testing smoke_test.py title extraction...")
+    # shared_cache_dir sets CACHE_DIR in case this import is the first one
+    from smoke_test import extract_title_from_html
     
-    # Set CACHE_DIR before importing to avoid permission issues
-    temp_cache = tempfile.mkdtemp()
-    os.environ['CACHE_DIR'] = temp_cache
+    title = extract_title_from_html(html)
+    assert title == expected, f"Failed: got '{title}'"
+    print(f"  ✓ {description}: '{expected}'")
+
+
+def test_smoke_test_streamed_response(cache_dir):
+    """Test smoke test streams the response body to disk."""
+    print("Testing smoke_test.py streamed response...")
+    
+    from smoke_test import save_response_head, extract_title_from_html
+    
+    # Closing tag split across chunks, non-ASCII title
+    chunks = [
+        '<html><head><title>Página'.encode('utf-8'),
+        ' Teste</ti'.encode('utf-8'),
+        b'tle></head>',
+        b'<body>' + b'x' * 1000 + b'</body></html>',
+    ]
+    response = MagicMock()
+    response.encoding = 'utf-8'
+    response.iter_content.return_value = iter(chunks)
     
-    from smoke_test import extract_title_from_html
+    out_html = cache_dir / 'streamed.html'
+    head = save_response_head(response, out_html)
     
-    # Test 1: Normal HTML with title
-    html_with_title = '<html><head><title>Test Title</title></head><body>Test</body></html>'
-    title = extract_title_from_html(html_with_title)
-    assert title == "Test Title", f"Failed: got '{title}'"
-    print(f"  ✓ Title extraction: 'Test Title'")
-    
-    # Test 2: HTML without title
-    html_no_title = '<html><body>No title</body></html>'
-    title = extract_title_from_html(html_no_title)
-    assert title == "Desconhecido", f"Failed: got '{title}'"
-    print(f"  ✓ No title case: 'Desconhecido'")
-    
-    # Test 3: HTML with empty title
-    html_empty_title = '<html><head><title></title></head><body>Test</body></html>'
-    title = extract_title_from_html(html_empty_title)
-    assert title == "Desconhecido", f"Failed: got '{title}'"
-    print(f"  ✓ Empty title case: 'Desconhecido'")
-    
-    # Test 4: HTML with whitespace in title
-    html_whitespace = '<html><head><title>  Spaced  Title  </title></head><body>Test</body></html>'
-    title = extract_title_from_html(html_whitespace)
-    assert title == "Spaced Title", f"Failed: got '{title}'"
-    print(f"  ✓ Whitespace title case: 'Spaced Title'")
-    
-    # Test 5: HTML with newlines in title
-    html_newlines = '<html><head><title>Multi\nLine\nTitle</title></head><body>Test</body></html>'
-    title = extract_title_from_html(html_newlines)
-    assert title == "Multi Line Title", f"Failed: got '{title}'"
-    print(f"  ✓ Newlines in title case: 'Multi Line Title'")
-    
-    # Test 6: HTML with case-insensitive title tag
-    html_uppercase = '<html><head><TITLE>Uppercase Title</TITLE></head><body>Test</body></html>'
-    title = extract_title_from_html(html_uppercase)
-    assert title == "Uppercase Title", f"Failed: got '{title}'"
-    print(f"  ✓ Case-insensitive title: 'Uppercase Title'")
-    
-    print("✓ All smoke_test title extraction tests passed!\n")
-
-
-def test_environment_variables():
+    assert out_html.read_bytes() == b''.join(chunks), "Body not fully written to disk"
+    print("  ✓ Full body written to disk")
+    
+    assert 'x' * 1000 not in head, "Body after </title> should not be buffered"
+    assert extract_title_from_html(head) == "Página Teste", f"Failed: got '{head}'"
+    print("  ✓ Title extracted from streamed head: 'Página Teste'")
+    
+    print("✓ All smoke_test streamed response tests passed!\n")
+
+
+@pytest.mark.forked
+def test_environment_variables(cache_dir, monkeypatch):
     """Test environment variable handling."""
     print("Testing environment variable handling...")
     
-    # Test default values - use temp directory to avoid permission issues
-    temp_cache = tempfile.mkdtemp()
-    os.environ['CACHE_DIR'] = temp_cache
-    os.environ.pop('TARGET_URL', None)
-    os.environ.pop('SCRIPT_URL', None)
+    # Test default values - cache_dir points CACHE_DIR at a temp directory
+    monkeypatch.delenv('TARGET_URL', raising=False)
+    monkeypatch.delenv('SCRIPT_URL', raising=False)
     
     # Import and check defaults
     import importlib
@@ -119,9 +143,9 @@ def test_environment_variables():
     print(f"  ✓ Default TARGET_URL: {smoke_test.TARGET_URL}")
     
     # Test custom values
-    os.environ['TARGET_URL'] = 'https://example.com/test'
-    custom_cache = tempfile.mkdtemp()
-    os.environ['CACHE_DIR'] = custom_cache
+    monkeypatch.setenv('TARGET_URL', 'https://example.com/test')
+    custom_cache = str(cache_dir / 'custom')
+    monkeypatch.setenv('CACHE_DIR', custom_cache)
     
     importlib.reload(smoke_test)
     
@@ -134,73 +158,92 @@ def test_environment_variables():
     print("✓ All environment variable tests passed!\n")
 
 
-def test_brave_example_script():
-    """Test Brave example script structure and configuration."""
-    print("Testing example_script_brave.py...")
-    
-    # Test 1: Check script exists and is readable
-    import pathlib
-    script_path = pathlib.Path(__file__).parent / 'example_script_brave.py'
+# Settings test_brave_example_configuration expects, found in one scan
+_BRAVE_CONFIG_RE = re.compile(r"binary_location|/usr/bin/brave-browser|--headless")
+
+
+@functools.lru_cache(maxsize=1)
+def _brave_script():
+    """Read and parse example_script_brave.py once for all the Brave checks.
+
+    Returns:
+        (source, function names, imported module names) tuple.
+    """
+    script_path = _HERE / 'example_script_brave.py'
     assert script_path.exists(), "example_script_brave.py not found"
-    print("  ✓ Script file exists")
-    
-    # Test 2: Parse the script without executing it
-    import ast
-    
-    with open(script_path, 'r') as f:
-        script_source = f.read()
-    
+    script_source = script_path.read_text()
     try:
         tree = ast.parse(script_source)
-        print("  ✓ Script has valid Python syntax")
     except SyntaxError as e:
         raise AssertionError(f"Script has syntax error: {e}")
     
-    # Test 3: Check for required functions
-    function_names = [node.name for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+    # One walk collects both functions and imports
+    function_names, imports = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            function_names.add(node.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                imports.add(node.module)
+        elif isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+    return script_source, function_names, imports
+
+
+def test_brave_example_script():
+    """Test Brave example script exists and has valid syntax."""
+    print("Testing example_script_brave.py...")
+    
+    _brave_script()
+    print("  ✓ Script file exists")
+    print("  ✓ Script has valid Python syntax")
+
+
+def test_brave_example_functions():
+    """Test Brave example script defines the driver and automation functions."""
+    print("Testing example_script_brave.py functions...")
+    
+    _, function_names, _ = _brave_script()
     
     assert 'create_brave_driver' in function_names, "Missing create_brave_driver function"
     print("  ✓ create_brave_driver function exists")
     
     assert 'example_automation' in function_names, "Missing example_automation function"
     print("  ✓ example_automation function exists")
+
+
+def test_brave_example_imports():
+    """Test Brave example script has the required imports."""
+    print("Testing example_script_brave.py imports...")
     
-    # Test 4: Verify the script has proper imports
-    imports = []
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ImportFrom):
-            if node.module:
-                imports.append(node.module)
-        elif isinstance(node, ast.Import):
-            for alias in node.names:
-                imports.append(alias.name)
+    _, _, imports = _brave_script()
     
-    required_imports = ['selenium', 'sys', 'os']
+    required_imports = {'selenium', 'sys', 'os'}
     
-    for imp in required_imports:
-        # Check if import is present (either exact match or as part of module path)
-        found = False
-        for import_name in imports:
-            if import_name and (imp == import_name or imp in import_name or import_name.startswith(imp + '.')):
-                found = True
-                break
-        assert found, f"Missing import: {imp}"
+    # Compare top-level packages, so 'selenium.webdriver' counts as 'selenium'
+    top_level = {name.split('.', 1)[0] for name in imports}
+    missing = required_imports - top_level
+    assert not missing, f"Missing imports: {', '.join(sorted(missing))}"
     
     print("  ✓ All required imports present")
-    
-    # Test 5: Check that the script configures Brave binary location
-    assert 'binary_location' in script_source, "Script should set binary_location for Brave"
-    assert '/usr/bin/brave-browser' in script_source, "Script should reference Brave browser path"
+
+
+def test_brave_example_configuration():
+    """Test Brave example script configures the Brave binary and headless mode."""
+    print("Testing example_script_brave.py configuration...")
+    
+    script_source, _, _ = _brave_script()
+    found = set(_BRAVE_CONFIG_RE.findall(script_source))
+    assert 'binary_location' in found, "Script should set binary_location for Brave"
+    assert '/usr/bin/brave-browser' in found, "Script should reference Brave browser path"
     print("  ✓ Brave binary location configured correctly")
     
-    # Test 6: Check for headless mode configuration
-    assert '--headless' in script_source, "Script should configure headless mode"
+    assert '--headless' in found, "Script should configure headless mode"
     print("  ✓ Headless mode configuration present")
     
     print("✓ All Brave example script tests passed!\n")
 
 
-
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -208,11 +251,23 @@ def main():
     print("=" * 60)
     print()
     
+    tests = [
+        test_script_downloader,
+        *(functools.partial(test_download_helper_scripts_empty, value) for value in _EMPTY_HELPER_URLS),
+        *(functools.partial(test_get_filename_from_url, *case) for case in _FILENAME_CASES),
+        *(functools.partial(test_smoke_test_title_extraction, *case) for case in _TITLE_CASES),
+        test_smoke_test_streamed_response,
+        test_environment_variables,
+        test_brave_example_script,
+        test_brave_example_functions,
+        test_brave_example_imports,
+        test_brave_example_configuration,
+    ]
+    
     try:
-        test_script_downloader()
-        test_smoke_test_title_extraction()
-        test_environment_variables()
-        test_brave_example_script()
+        with script_fixtures() as run_test:
+            for test in tests:
+                run_test(test)
         
         print("=" * 60)
         print("✓ All tests passed successfully!")
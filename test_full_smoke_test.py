@@ -6,304 +6,246 @@ Tests the comprehensive smoke test functionality.
 
 import os
 import sys
-import tempfile
 import json
-import pathlib
-from unittest.mock import patch, MagicMock
+import traceback
+from unittest.mock import patch
 
+import pytest
 
-def test_imports():
+from fixture_runner import script_fixtures
+
+
+def test_imports(shared_cache_dir, monkeypatch):
     """Test that full_smoke_test.py can be imported without errors."""
     print("Testing full_smoke_test.py imports...")
     
     # Set required environment variables before import
-    os.environ['DISPLAY'] = ':99'
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        import full_smoke_test
-        print("  ✓ full_smoke_test module imported successfully")
-        return True
-    except Exception as e:
-        print(f"  ✗ Failed to import full_smoke_test: {e}")
-        return False
+    monkeypatch.setenv('DISPLAY', ':99')
+    
+    import full_smoke_test
+    print("  ✓ full_smoke_test module imported successfully")
 
 
-def test_log_function():
+def test_log_function(shared_cache_dir, monkeypatch):
     """Test the log function."""
     print("Testing log function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import log, log_verbose
-        
-        # Test basic logging
-        log("Test message")
-        log("Test error", "ERROR")
-        
-        # Test verbose logging
-        os.environ['VERBOSE'] = '1'
-        import importlib
-        import full_smoke_test as fsm
-        importlib.reload(fsm)
-        
-        print("  ✓ Log functions work correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ Log function test failed: {e}")
-        return False
+    from full_smoke_test import log, log_verbose
+    
+    # Test basic logging
+    log("Test message")
+    log("Test error", "ERROR")
+    
+    # Test verbose logging; VERBOSE is read at import, so patch the module
+    # global instead of reloading it
+    import full_smoke_test as fsm
+    monkeypatch.setattr(fsm, 'VERBOSE', True)
+    log_verbose("Test verbose message")
+    
+    print("  ✓ Log functions work correctly")
 
 
-def test_record_test_function():
+def test_record_test_function(shared_cache_dir):
     """Test the record_test function."""
     print("Testing record_test function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import record_test, test_results
-        
-        # Clear existing results
-        test_results.clear()
-        
-        # Record a passing test
-        record_test("test_pass", True, "This test passed")
-        assert "test_pass" in test_results
-        assert test_results["test_pass"]["passed"] is True
-        assert test_results["test_pass"].get("skipped") is False
-        
-        # Record a failing test
-        record_test("test_fail", False, "This test failed")
-        assert "test_fail" in test_results
-        assert test_results["test_fail"]["passed"] is False
-        
-        print("  ✓ record_test function works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ record_test function test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from full_smoke_test import record_test, test_results
+    
+    # Clear existing results
+    test_results.clear()
+    
+    # Record a passing test
+    record_test("test_pass", True, "This test passed")
+    assert "test_pass" in test_results
+    assert test_results["test_pass"]["passed"] is True
+    assert test_results["test_pass"].get("skipped") is False
+    
+    # Record a failing test
+    record_test("test_fail", False, "This test failed")
+    assert "test_fail" in test_results
+    assert test_results["test_fail"]["passed"] is False
+    
+    print("  ✓ record_test function works correctly")
 
 
-def test_check_python_version():
+def test_check_python_version(shared_cache_dir):
     """Test Python version check."""
     print("Testing check_python_version function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import check_python_version, test_results
-        
-        test_results.clear()
-        result = check_python_version()
-        
-        # Should pass for Python 3.8+
-        assert result is True
-        assert "python_version" in test_results
-        assert test_results["python_version"]["passed"] is True
-        
-        print("  ✓ check_python_version works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ check_python_version test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from full_smoke_test import check_python_version, test_results
+    
+    test_results.clear()
+    result = check_python_version()
+    
+    # Should pass for Python 3.8+
+    assert result is True
+    assert "python_version" in test_results
+    assert test_results["python_version"]["passed"] is True
+    
+    print("  ✓ check_python_version works correctly")
 
 
-def test_check_process_alive():
+def test_check_process_alive(shared_cache_dir):
     """Test process alive check."""
     print("Testing check_process_alive function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import check_process_alive
-        
-        # Test with a process that should exist (bash or python)
-        result = check_process_alive("bash")
-        # Result can be True or False depending on system, just check it runs
-        assert isinstance(result, bool)
-        
-        # Test with a process that shouldn't exist
-        result = check_process_alive("nonexistent_process_12345")
-        assert result is False
-        
-        print("  ✓ check_process_alive works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ check_process_alive test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from full_smoke_test import check_process_alive
+    
+    # Test with a process that should exist (bash or python)
+    result = check_process_alive("bash")
+    # Result can be True or False depending on system, just check it runs
+    assert isinstance(result, bool)
+    
+    # Test with a process that shouldn't exist
+    result = check_process_alive("nonexistent_process_12345")
+    assert result is False
+    
+    print("  ✓ check_process_alive works correctly")
 
 
-def test_filesystem_operations():
+def test_filesystem_operations(cache_dir, monkeypatch):
     """Test filesystem operations test function."""
     print("Testing test_filesystem_operations function...")
     
-    cache_dir = tempfile.mkdtemp()
-    os.environ['CACHE_DIR'] = cache_dir
-    
-    try:
-        import importlib
-        import full_smoke_test as fsm
-        importlib.reload(fsm)
-        
-        fsm.test_results.clear()
-        result = fsm.test_filesystem_operations()
-        
-        # Should pass
-        assert result is True
-        assert "filesystem_operations" in fsm.test_results
-        assert fsm.test_results["filesystem_operations"]["passed"] is True
-        
-        print("  ✓ test_filesystem_operations works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ test_filesystem_operations test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    # CACHE_DIR is read at import; point the module at this test's directory
+    # instead of reloading it
+    import full_smoke_test as fsm
+    monkeypatch.setattr(fsm, 'CACHE_DIR', cache_dir)
+    fsm.test_results.clear()
+    result = fsm.test_filesystem_operations()
+    
+    # Should pass
+    assert result is True
+    assert "filesystem_operations" in fsm.test_results
+    assert fsm.test_results["filesystem_operations"]["passed"] is True
+    
+    print("  ✓ test_filesystem_operations works correctly")
 
 
-def test_script_downloader_test():
+def test_script_downloader_test(shared_cache_dir):
     """Test script downloader test function."""
     print("Testing test_script_downloader function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import test_script_downloader, test_results
-        
-        test_results.clear()
-        result = test_script_downloader()
-        
-        # Should pass
-        assert result is True
-        assert "script_downloader" in test_results
-        assert test_results["script_downloader"]["passed"] is True
-        
-        print("  ✓ test_script_downloader works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ test_script_downloader test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from full_smoke_test import test_script_downloader, test_results
+    
+    test_results.clear()
+    result = test_script_downloader()
+    
+    # Should pass
+    assert result is True
+    assert "script_downloader" in test_results
+    assert test_results["script_downloader"]["passed"] is True
+    
+    print("  ✓ test_script_downloader works correctly")
 
 
-def test_environment_variables_test():
+def test_environment_variables_test(shared_cache_dir):
     """Test environment variables test function."""
     print("Testing test_environment_variables function...")
     
-    os.environ['CACHE_DIR'] = tempfile.mkdtemp()
-    
-    try:
-        from full_smoke_test import test_environment_variables, test_results
-        
-        test_results.clear()
-        result = test_environment_variables()
-        
-        # Should pass
-        assert result is True
-        assert "environment_variables" in test_results
-        assert test_results["environment_variables"]["passed"] is True
-        
-        print("  ✓ test_environment_variables works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ test_environment_variables test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from full_smoke_test import test_environment_variables, test_results
+    
+    test_results.clear()
+    result = test_environment_variables()
+    
+    # Should pass
+    assert result is True
+    assert "environment_variables" in test_results
+    assert test_results["environment_variables"]["passed"] is True
+    
+    print("  ✓ test_environment_variables works correctly")
+
+
+def _report_files(cache_dir):
+    """List report files in cache_dir with one scandir and no fnmatch."""
+    with os.scandir(cache_dir) as entries:
+        return [
+            entry.path for entry in entries
+            if entry.name.startswith("full_smoke_test_report_") and entry.name.endswith(".json")
+        ]
 
 
-def test_report_generation():
+def test_report_generation(cache_dir, monkeypatch):
     """Test report generation."""
     print("Testing generate_report function...")
     
-    cache_dir = tempfile.mkdtemp()
-    os.environ['CACHE_DIR'] = cache_dir
-    
-    try:
-        import importlib
-        import full_smoke_test as fsm
-        importlib.reload(fsm)
-        
-        # Add some test results
-        fsm.test_results.clear()
-        fsm.record_test("test1", True, "Test 1 passed")
-        fsm.record_test("test2", False, "Test 2 failed")
-        fsm.record_test("test3", True, "Test 3 passed")
+    # CACHE_DIR is read at import; point the module at this test's directory
+    # instead of reloading it
+    import full_smoke_test as fsm
+    monkeypatch.setattr(fsm, 'CACHE_DIR', cache_dir)
+    
+    # Add some test results
+    fsm.test_results.clear()
+    fsm.record_test("test1", True, "Test 1 passed")
+    fsm.record_test("test2", False, "Test 2 failed")
+    fsm.record_test("test3", True, "Test 3 passed")
+    
+    passed, executed, skipped = fsm.generate_report()
+    
+    assert passed == 2
+    assert executed == 3
+    assert skipped == 0
+    
+    # Check if report file was created
+    report_files = _report_files(cache_dir)
+    assert len(report_files) > 0
+    
+    # Check report content
+    with open(report_files[0]) as f:
+        report = json.load(f)
+        assert report["total_tests"] == 3
+        assert report["executed_tests"] == 3
+        assert report["passed"] == 2
+        assert report["failed"] == 1
+        assert report["skipped"] == 0
+        assert "test1" in report["tests"]
+        assert "test2" in report["tests"]
+        assert "test3" in report["tests"]
+    
+    print("  ✓ generate_report works correctly")
 
-        passed, executed, skipped = fsm.generate_report()
 
-        assert passed == 2
-        assert executed == 3
-        assert skipped == 0
-        
-        # Check if report file was created
-        report_files = list(pathlib.Path(cache_dir).glob("full_smoke_test_report_*.json"))
-        assert len(report_files) > 0
-        
-        # Check report content
-        with open(report_files[0]) as f:
-            report = json.load(f)
-            assert report["total_tests"] == 3
-            assert report["executed_tests"] == 3
-            assert report["passed"] == 2
-            assert report["failed"] == 1
-            assert report["skipped"] == 0
-            assert "test1" in report["tests"]
-            assert "test2" in report["tests"]
-            assert "test3" in report["tests"]
-        
-        print("  ✓ generate_report works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ generate_report test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+def test_dump_report_fallback():
+    """Test that the stdlib json fallback matches the orjson report output."""
+    print("Testing dump_report fallback...")
+    
+    import full_smoke_test as fsm
+    report_data = {"passed": 1, "tests": {"título": {"details": "ok ✓", "skipped": False}}}
+    
+    with patch.object(fsm, 'orjson', None):
+        fallback = fsm.dump_report(report_data)
+    
+    assert json.loads(fallback) == report_data
+    assert json.loads(fsm.dump_report(report_data)) == report_data
+    
+    print("  ✓ dump_report fallback works correctly")
 
 
-def test_configuration_from_env():
+@pytest.mark.forked
+def test_configuration_from_env(cache_dir, monkeypatch):
     """Test configuration from environment variables."""
     print("Testing configuration from environment variables...")
     
-    cache_dir = tempfile.mkdtemp()
-    
-    try:
-        # Set custom environment variables
-        os.environ['TARGET_URL'] = 'https://test.example.com'
-        os.environ['CACHE_DIR'] = cache_dir
-        os.environ['TEST_ALL_BROWSERS'] = '1'
-        os.environ['CHECK_PROCESSES'] = '1'
-        os.environ['VERBOSE'] = '1'
-        os.environ['BRAVE_BROWSER_PATH'] = '/opt/brave'
-        
-        # Reload module to pick up new env vars
-        import importlib
-        import full_smoke_test as fsm
-        importlib.reload(fsm)
-        
-        assert fsm.TARGET_URL == 'https://test.example.com'
-        assert str(fsm.CACHE_DIR) == cache_dir
-        assert fsm.TEST_ALL_BROWSERS is True
-        assert fsm.CHECK_PROCESSES is True
-        assert fsm.VERBOSE is True
-        assert fsm.BRAVE_BROWSER_PATH == '/opt/brave'
-        
-        print("  ✓ Configuration from environment variables works correctly")
-        return True
-    except Exception as e:
-        print(f"  ✗ Configuration test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    # Set custom environment variables (cache_dir sets CACHE_DIR)
+    monkeypatch.setenv('TARGET_URL', 'https://test.example.com')
+    monkeypatch.setenv('TEST_ALL_BROWSERS', '1')
+    monkeypatch.setenv('CHECK_PROCESSES', '1')
+    monkeypatch.setenv('VERBOSE', '1')
+    monkeypatch.setenv('BRAVE_BROWSER_PATH', '/opt/brave')
+    
+    # Reload module to pick up new env vars
+    import importlib
+    import full_smoke_test as fsm
+    importlib.reload(fsm)
+    
+    assert fsm.TARGET_URL == 'https://test.example.com'
+    assert fsm.CACHE_DIR == cache_dir
+    assert fsm.TEST_ALL_BROWSERS is True
+    assert fsm.CHECK_PROCESSES is True
+    assert fsm.VERBOSE is True
+    assert fsm.BRAVE_BROWSER_PATH == '/opt/brave'
+    
+    print("  ✓ Configuration from environment variables works correctly")
 
 
 def main():
@@ -313,40 +255,44 @@ def main():
     print("=" * 60)
     print()
     
+    tests = [
+        test_imports,
+        test_log_function,
+        test_record_test_function,
+        test_check_python_version,
+        test_check_process_alive,
+        test_filesystem_operations,
+        test_script_downloader_test,
+        test_environment_variables_test,
+        test_report_generation,
+        test_dump_report_fallback,
+        test_configuration_from_env,
+    ]
+    
     results = []
+    with script_fixtures() as run_test:
+        for test in tests:
+            try:
+                run_test(test)
+                results.append(True)
+            except Exception as e:
+                print(f"  ✗ {test.__name__} failed: {e}")
+                traceback.print_exc()
+                results.append(False)
     
-    try:
-        results.append(test_imports())
-        results.append(test_log_function())
-        results.append(test_record_test_function())
-        results.append(test_check_python_version())
-        results.append(test_check_process_alive())
-        results.append(test_filesystem_operations())
-        results.append(test_script_downloader_test())
-        results.append(test_environment_variables_test())
-        results.append(test_report_generation())
-        results.append(test_configuration_from_env())
-        
-        print()
-        print("=" * 60)
-        passed = sum(results)
-        total = len(results)
-        print(f"Test Results: {passed}/{total} passed")
-        print("=" * 60)
-        
-        if all(results):
-            print("✓ All tests passed successfully!")
-            return 0
-        else:
-            print(f"✗ {total - passed} test(s) failed!")
-            return 1
-            
-    except Exception as e:
-        print(f"\n✗ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+    print()
+    print("=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Test Results: {passed}/{total} passed")
+    print("=" * 60)
+    
+    if all(results):
+        print("✓ All tests passed successfully!")
+        return 0
+    else:
+        print(f"✗ {total - passed} test(s) failed!")
         return 1
 
-
 if __name__ == "__main__":
     sys.exit(main())
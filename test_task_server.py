@@ -14,10 +14,14 @@ import json
 import os
 import tempfile
 from unittest.mock import patch, MagicMock
+import asyncio
+import subprocess
 from task_server import (
     validate_auth,
     validate_payload,
+    run_script,
     app,
+    task_slot,
     TASK_AUTH_TOKEN
 )
 
@@ -55,16 +59,17 @@ class TestPayloadValidation:
             "script_name": "script_abc123.py",
             "payload": {"key": "value"}
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is True
         assert error is None
+        assert script_name == "script_abc123.py"
     
     def test_missing_script_url(self):
         """Test validation fails when script_url is missing."""
         payload = {
             "script_name": "script.py"
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is False
         assert "script_url" in error
     
@@ -73,7 +78,7 @@ class TestPayloadValidation:
         payload = {
             "script_url": "https://example.com/script.py"
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is False
         assert "script_name" in error
     
@@ -83,7 +88,7 @@ class TestPayloadValidation:
             "script_url": "http://example.com/script.py",
             "script_name": "script.py"
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is False
         assert "HTTPS" in error
     
@@ -93,7 +98,7 @@ class TestPayloadValidation:
             "script_url": "https://example.com/script_abc.py",
             "script_name": "different_name.py"
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is False
         assert "does not match" in error
     
@@ -104,14 +109,15 @@ class TestPayloadValidation:
             "script_name": "script_abc.py",
             "payload": "not a dict"
         }
-        valid, error = validate_payload(payload)
+        valid, error, script_name = validate_payload(payload)
         assert valid is False
         assert "JSON object" in error
     
     def test_empty_payload(self):
         """Test validation fails for empty payload."""
-        valid, error = validate_payload(None)
+        valid, error, script_name = validate_payload(None)
         assert valid is False
+        assert script_name is None
         assert "Empty payload" in error
 
 
@@ -153,6 +159,16 @@ class TestAuthValidation:
                 valid, error = validate_auth()
                 assert valid is False
                 assert "Invalid" in error
+    
+    def test_non_bearer_auth_scheme(self, client):
+        """Test auth fails when the scheme is not Bearer."""
+        with patch('task_server.TASK_AUTH_TOKEN', 'secret-token'):
+            with client.application.test_request_context(
+                headers={'Authorization': 'Basic secret-token'}
+            ):
+                valid, error = validate_auth()
+                assert valid is False
+                assert "Authorization" in error
 
 
 class TestTaskEndpoint:
@@ -201,25 +217,30 @@ class TestTaskEndpoint:
         data = json.loads(response.data)
         assert 'script_url' in data['error']
     
-    @patch('task_server.task_executing', True)
     def test_task_endpoint_rejects_concurrent_tasks(self, client):
         """Test task endpoint rejects concurrent tasks with 409 Conflict."""
         payload = {
             "script_url": "https://example.com/script_abc.py",
             "script_name": "script_abc.py"
         }
-        response = client.post(
-            '/task',
-            data=json.dumps(payload),
-            content_type='application/json'
-        )
+        # Simulate a task already holding the slot
+        assert task_slot.acquire(blocking=False)
+        try:
+            response = client.post(
+                '/task',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+            health = json.loads(client.get('/health').data)
+        finally:
+            task_slot.release()
         assert response.status_code == 409
+        assert health['task_executing'] is True
         data = json.loads(response.data)
         assert data['status'] == 'conflict'
     
-    @patch('task_server.threading.Thread')
-    @patch('task_server.task_executing', False)
-    def test_task_endpoint_accepts_valid_task(self, mock_thread, client):
+    @patch('task_server.asyncio.run_coroutine_threadsafe')
+    def test_task_endpoint_accepts_valid_task(self, mock_submit, client):
         """Test task endpoint accepts valid task and returns 202."""
         payload = {
             "script_url": "https://example.com/script_abc123.py",
@@ -238,6 +259,57 @@ class TestTaskEndpoint:
         assert data['status'] == 'accepted'
         assert data['script_url'] == payload['script_url']
         assert data['script_name'] == payload['script_name']
+        
+        # Execution is scheduled on the task loop, not run inline
+        mock_submit.assert_called_once()
+        mock_submit.call_args[0][0].close()
+        
+        # The slot stays held until the task releases it
+        assert task_slot.locked()
+        task_slot.release()
+    
+    def test_task_slot_released_after_invalid_payload(self, client):
+        """Test a rejected payload does not keep the task slot busy."""
+        response = client.post(
+            '/task',
+            data=json.dumps({"script_name": "script.py"}),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert not task_slot.locked()
+
+
+class TestRunScript:
+    """Test script execution and output capture."""
+    
+    def test_captures_output_and_exit_code(self, tmp_path):
+        """Test stdout, stderr and return code are captured."""
+        script = tmp_path / "script_ok.py"
+        script.write_text(
+            "import sys\n"
+            "print('hello')\n"
+            "print('oops', file=sys.stderr)\n"
+            "sys.exit(3)\n"
+        )
+        result = asyncio.run(run_script(script, timeout=30))
+        assert result.returncode == 3
+        assert result.stdout.strip() == "hello"
+        assert result.stderr.strip() == "oops"
+    
+    def test_large_output_does_not_block(self, tmp_path):
+        """Test output larger than the pipe buffer is drained."""
+        script = tmp_path / "script_big.py"
+        script.write_text("print('x' * 200000)\n")
+        result = asyncio.run(run_script(script, timeout=30))
+        assert result.returncode == 0
+        assert len(result.stdout.strip()) == 200000
+    
+    def test_timeout_kills_script(self, tmp_path):
+        """Test a script exceeding the timeout raises TimeoutExpired."""
+        script = tmp_path / "script_slow.py"
+        script.write_text("import time\ntime.sleep(30)\n")
+        with pytest.raises(subprocess.TimeoutExpired):
+            asyncio.run(run_script(script, timeout=0.5))
 
 
 if __name__ == '__main__':
@@ -188,7 +188,8 @@ def test_entrypoint_syntax():
     # Use bash -n to check syntax without executing
     result = subprocess.run(
         ['bash', '-n', entrypoint_path],
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         text=True
     )
     